@@ -0,0 +1,318 @@
+from collections import namedtuple
+from bisect import bisect_right
+import requests
+import json
+import sys
+import time
+
+"""
+Author:         Nick Loden
+
+Last Update:    10/18/2026
+
+Description:    This module evaluates price alert rules against every tick of real_time_stock_price.py and sends the
+                alerts that fire to one or more sinks (stdout, an append only file, or a webhook). Rules are read
+                from a json file and compiled once per ticker: price thresholds are kept in sorted lists so a tick
+                only needs two binary searches to find every threshold it crossed, percent move thresholds are
+                sorted per window the same way, and moving average crossings compare two rolling means that
+                tick_history.py already maintains. Alerts fire when a condition becomes true, not on every tick
+                while it stays true.
+
+                Rule file format (a json list, ticker "*" applies a rule to every ticker in the watchlist):
+                    [
+                        {"ticker": "aapl", "type": "above", "value": 150},
+                        {"ticker": "aapl", "type": "below", "value": 140},
+                        {"ticker": "msft", "type": "move", "value": 2.5, "window": 20},
+                        {"ticker": "*", "type": "cross", "fast": 5, "slow": 20}
+                    ]
+
+                above/below fire when the price crosses the value, move fires when the absolute percent change
+                over the last `window` ticks reaches the value, and cross fires when the `fast` tick moving average
+                crosses the `slow` tick moving average in either direction.
+
+Input:          None
+
+Standard Form:  import alerts
+                engine = alerts.AlertEngine(alerts.load_rules('rules.json'), ['aapl', 'msft'])
+                sinks = [alerts.get_sink('stdout'), alerts.get_sink('webhook:http://127.0.0.1:9000/alerts')]
+                alerts.dispatch(engine.evaluate('aapl', time.time(), history), sinks)
+"""
+
+
+RULE_TYPES = ('above', 'below', 'move', 'cross')
+
+Rule = namedtuple('Rule', ['ticker', 'type', 'value', 'window', 'fast', 'slow'])
+Alert = namedtuple('Alert', ['timestamp', 'ticker', 'rule', 'price', 'message'])
+
+
+class AlertRuleError(Exception):
+    """raised when an alert rule file is missing, malformed, or contains an invalid rule."""
+
+
+def parse_rule(spec):
+    """
+    parse_rule validates one rule dictionary from a rule file.
+    :param spec: dictionary with ticker and type keys, plus value, window, fast or slow depending on the type.
+    :return: Rule named tuple.
+    """
+    if not isinstance(spec, dict):
+        raise AlertRuleError('rule must be an object: {}'.format(spec))
+    rule_type = spec.get('type')
+    if rule_type not in RULE_TYPES:
+        raise AlertRuleError('rule type must be one of {}: {}'.format(', '.join(RULE_TYPES), spec))
+    ticker = str(spec.get('ticker', '*')).upper()
+    try:
+        if rule_type == 'cross':
+            fast, slow = int(spec['fast']), int(spec['slow'])
+            if not 1 < fast < slow:
+                raise AlertRuleError('cross rule needs 1 < fast < slow: {}'.format(spec))
+            return Rule(ticker, rule_type, None, None, fast, slow)
+        value = float(spec['value'])
+        window = int(spec['window']) if rule_type == 'move' else None
+    except (KeyError, TypeError, ValueError):
+        raise AlertRuleError('rule is missing a required numeric field: {}'.format(spec))
+    if value <= 0 or (window is not None and window < 2):
+        raise AlertRuleError('rule value must be positive and window at least 2: {}'.format(spec))
+    return Rule(ticker, rule_type, value, window, None, None)
+
+
+def load_rules(path):
+    """
+    load_rules reads and validates a json rule file.
+    :param path: rule file path.
+    :return: list of Rule named tuples.
+    """
+    try:
+        with open(path) as f:
+            specs = json.load(f)
+    except (OSError, ValueError) as err:
+        raise AlertRuleError('unable to read {}: {}'.format(path, err))
+    if not isinstance(specs, list):
+        raise AlertRuleError('{} must contain a list of rules'.format(path))
+    return [parse_rule(spec) for spec in specs]
+
+
+class SortedThresholds:
+    """
+    SortedThresholds holds the values of one kind of threshold rule in ascending order, so every value between two
+    observations can be found with binary search instead of checking each rule.
+    """
+
+    def __init__(self, rules):
+        rules = sorted(rules, key=lambda rule: rule.value)
+        self.values = [rule.value for rule in rules]
+        self.rules = rules
+
+    def __bool__(self):
+        return bool(self.values)
+
+    def rising(self, old, new):
+        """returns the rules whose value was reached on the way up from old (exclusive) to new (inclusive)."""
+        return self.rules[bisect_right(self.values, old):bisect_right(self.values, new)]
+
+    def falling(self, old, new):
+        """returns the rules whose value was passed on the way down from old (inclusive) to new (exclusive)."""
+        return self.rules[bisect_right(self.values, new):bisect_right(self.values, old)]
+
+
+class TickerRules:
+    """
+    TickerRules is the compiled form of every rule that applies to one ticker, plus the state needed to detect when
+    a condition changes.
+    """
+
+    def __init__(self, rules):
+        self.above = SortedThresholds([rule for rule in rules if rule.type == 'above'])
+        self.below = SortedThresholds([rule for rule in rules if rule.type == 'below'])
+        moves = {}
+        for rule in rules:
+            if rule.type == 'move':
+                moves.setdefault(rule.window, []).append(rule)
+        self.moves = {window: SortedThresholds(window_rules) for window, window_rules in moves.items()}
+        self.crosses = [rule for rule in rules if rule.type == 'cross']
+        self.last_price = None
+        self.last_moves = {window: 0.0 for window in self.moves}
+        self.last_cross = {}  # (fast, slow) -> True if the fast average was above the slow average
+
+
+class AlertEngine:
+    """
+    AlertEngine compiles alert rules per ticker and evaluates them against each new tick.
+    """
+
+    def __init__(self, rules, tickers):
+        """
+        :param rules: list of Rule named tuples.
+        :param tickers: list of ticker strings in the watchlist. rules for other tickers are ignored.
+        """
+        self.rules = rules
+        self.compiled = {}
+        for ticker in tickers:
+            ticker_rules = [rule for rule in rules if rule.ticker in ('*', ticker.upper())]
+            if ticker_rules:
+                self.compiled[ticker] = TickerRules(ticker_rules)
+
+    def windows(self):
+        """returns the rolling statistics windows the rules need tick_history.TickHistory to maintain."""
+        windows = set()
+        for rule in self.rules:
+            windows.update(size for size in (rule.window, rule.fast, rule.slow) if size is not None)
+        return windows
+
+    def evaluate(self, ticker, timestamp, history):
+        """
+        evaluate checks the rules of one ticker against its newest tick.
+        :param ticker: the ticker that ticked.
+        :param timestamp: tick time (epoch seconds).
+        :param history: the ticker's tick_history.TickHistory, with the new tick already appended.
+        :return: list of Alert named tuples that fired on this tick.
+        """
+        compiled = self.compiled.get(ticker)
+        if compiled is None:
+            return []
+        price = history.price_at(0)
+        fired = []
+
+        # a threshold that is already breached on the first tick fires once
+        if compiled.above:
+            old = compiled.last_price if compiled.last_price is not None else float('-inf')
+            for rule in compiled.above.rising(old, price):
+                fired.append(Alert(timestamp, ticker, rule, price, '{} rose above {:.2f}'.format(ticker.upper(), rule.value)))
+        if compiled.below:
+            old = compiled.last_price if compiled.last_price is not None else float('inf')
+            for rule in compiled.below.falling(old, price):
+                fired.append(Alert(timestamp, ticker, rule, price, '{} fell below {:.2f}'.format(ticker.upper(), rule.value)))
+        compiled.last_price = price
+
+        for window, thresholds in compiled.moves.items():
+            stats = history.stats(window)
+            move = abs(stats['pct_change']) if stats is not None else 0.0
+            for rule in thresholds.rising(compiled.last_moves[window], move):
+                fired.append(Alert(timestamp, ticker, rule, price, '{} moved {:+.2f}% over {} ticks'.format(
+                    ticker.upper(), stats['pct_change'], window)))
+            compiled.last_moves[window] = move
+
+        for rule in compiled.crosses:
+            # only compare averages once the slow window is full, so start up noise does not fire crossings
+            if history.windows[rule.slow].count < rule.slow:
+                continue
+            fast_mean, slow_mean = history.windows[rule.fast].mean(), history.windows[rule.slow].mean()
+            above = fast_mean > slow_mean
+            previous = compiled.last_cross.get((rule.fast, rule.slow))
+            if previous is not None and above != previous:
+                fired.append(Alert(timestamp, ticker, rule, price, '{} {} tick average crossed {} the {} tick average'.format(
+                    ticker.upper(), rule.fast, 'above' if above else 'below', rule.slow)))
+            compiled.last_cross[(rule.fast, rule.slow)] = above
+
+        return fired
+
+
+class AlertSink:
+    """
+    AlertSink is the interface every alert destination implements.
+    """
+
+    # True if the sink writes to the terminal, so the monitor knows not to redraw over it
+    writes_stdout = False
+
+    def send(self, alerts):
+        """send delivers a list of Alert named tuples."""
+        raise NotImplementedError
+
+    def close(self):
+        """close releases any resources held by the sink."""
+        pass
+
+
+def format_alert(alert):
+    """returns a one line, human readable form of an alert."""
+    return '{} ALERT {} (price {:.2f})'.format(
+        time.strftime('%H:%M:%S', time.localtime(alert.timestamp)), alert.message, alert.price)
+
+
+def alert_to_dict(alert):
+    """returns a json serializable form of an alert."""
+    return {
+        'timestamp': alert.timestamp,
+        'ticker': alert.ticker.upper(),
+        'type': alert.rule.type,
+        'price': alert.price,
+        'message': alert.message,
+    }
+
+
+class StdoutSink(AlertSink):
+    """
+    StdoutSink prints each alert on its own line.
+    """
+
+    writes_stdout = True
+
+    def send(self, alerts):
+        for alert in alerts:
+            sys.stdout.write(format_alert(alert) + '\n')
+        sys.stdout.flush()
+
+
+class FileSink(AlertSink):
+    """
+    FileSink appends each alert to a file as one json object per line.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'a')
+
+    def send(self, alerts):
+        for alert in alerts:
+            self.file.write(json.dumps(alert_to_dict(alert)) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class WebhookSink(AlertSink):
+    """
+    WebhookSink posts the alerts of each tick as one json list to a url, over a keep-alive session. A failed post is
+    reported on standard error and does not stop the monitor.
+    """
+
+    def __init__(self, url, timeout=2):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, alerts):
+        try:
+            response = self.session.post(self.url, json=[alert_to_dict(alert) for alert in alerts], timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as err:
+            sys.stderr.write('Warning: unable to post alerts to {}: {}\n'.format(self.url, err))
+
+    def close(self):
+        self.session.close()
+
+
+def get_sink(spec):
+    """
+    get_sink returns a new sink for a sink specification.
+    :param spec: stdout, file:<path>, or webhook:<url>.
+    :return: AlertSink instance.
+    """
+    kind, _, target = spec.partition(':')
+    if kind == 'stdout' and not target:
+        return StdoutSink()
+    if kind == 'file' and target:
+        return FileSink(target)
+    if kind == 'webhook' and target:
+        return WebhookSink(target)
+    raise AlertRuleError('alert sink must be stdout, file:<path> or webhook:<url>: {}'.format(spec))
+
+
+def dispatch(alerts, sinks):
+    """sends alerts to every sink. returns True if any sink wrote to standard out."""
+    if not alerts:
+        return False
+    for sink in sinks:
+        sink.send(alerts)
+    return any(sink.writes_stdout for sink in sinks)
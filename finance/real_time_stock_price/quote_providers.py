@@ -0,0 +1,298 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import requests
+import random
+import json
+import time
+import os
+
+"""
+Author:         Nick Loden
+
+Last Update:    10/18/2026
+
+Description:    This module provides interchangeable quote providers for real_time_stock_price.py. Every provider
+                exposes get_prices(tickers), which returns the latest price of each ticker in as few upstream
+                requests as the source allows. The yahoo provider keeps a pooled keep-alive session, spaces requests
+                to respect rate limits, and retries with exponential backoff and jitter. The mock provider generates
+                prices in process so the monitor can be exercised without network access.
+
+Input:          None
+
+Standard Form:  import quote_providers
+                provider = quote_providers.get_provider('yahoo')
+                provider.get_prices(['aapl', 'msft'])
+"""
+
+
+VALIDATION_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'real_time_stock_price', 'valid_tickers.json')
+VALIDATION_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+
+
+class QuoteProviderError(Exception):
+    """raised when a provider cannot obtain prices after exhausting its retries."""
+
+
+class QuoteProvider:
+    """
+    QuoteProvider is the interface every quote source implements.
+    """
+
+    name = 'base'
+
+    def get_prices(self, tickers):
+        """
+        get_prices returns the latest price for each ticker.
+        :param tickers: list of ticker strings.
+        :return: dictionary of ticker to price (float), or None if the price could not be obtained.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """close releases any connections held by the provider."""
+        pass
+
+
+class YahooQuoteProvider(QuoteProvider):
+    """
+    YahooQuoteProvider queries the yahoo finance quote api over a pooled, keep-alive session. Symbols are batched
+    into a single quote request where the api allows it, falling back to one chart request per symbol otherwise.
+    """
+
+    name = 'yahoo'
+    quote_url = 'https://query1.finance.yahoo.com/v7/finance/quote'
+    chart_url = 'https://query1.finance.yahoo.com/v8/finance/chart/{}'
+
+    def __init__(self, batch_size=50, max_retries=4, backoff_base=0.5, backoff_cap=30.0, min_interval=0.2,
+                 pool_size=10, timeout=5):
+        """
+        :param batch_size: maximum number of symbols per batched quote request.
+        :param max_retries: number of retries for rate limited (429), server (5xx) and connection errors.
+        :param backoff_base: initial backoff delay in seconds, doubled on every retry.
+        :param backoff_cap: maximum backoff delay in seconds.
+        :param min_interval: minimum number of seconds between two requests, to stay under rate limits.
+        :param pool_size: number of keep-alive connections in the session pool.
+        :param timeout: request timeout in seconds.
+        """
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.batch_supported = True
+        self._last_request = 0.0
+        self._rate_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size)
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'Mozilla/5.0', 'Connection': 'keep-alive'})
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+
+    def _wait_for_rate_limit(self):
+        """block until at least min_interval seconds have passed since the previous request."""
+        with self._rate_lock:
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+
+    def _backoff(self, attempt, retry_after=None):
+        """sleep for the server provided Retry-After, or an exponential delay with full jitter. either is capped at
+        backoff_cap, so a large Retry-After cannot stall the caller."""
+        if retry_after is not None and retry_after.isdigit():
+            delay = min(self.backoff_cap, float(retry_after))
+        else:
+            delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        time.sleep(delay)
+
+    def _get_json(self, url, params=None):
+        """
+        _get_json performs a GET request with rate limiting and retries. connection errors, rate limiting (429),
+        server errors (5xx) and bodies that are not json are retried.
+        :return: decoded json body, or None for a non retryable client error (e.g. unknown symbol).
+        :raises QuoteProviderError: if the request still fails after max_retries retries.
+        """
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_rate_limit()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.exceptions.RequestException as err:
+                if attempt == self.max_retries:
+                    raise QuoteProviderError('request to {} failed: {}'.format(url, err))
+                self._backoff(attempt)
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.max_retries:
+                    raise QuoteProviderError('request to {} failed with status {}'.format(url, response.status_code))
+                self._backoff(attempt, response.headers.get('Retry-After'))
+                continue
+            if response.status_code >= 400:
+                return None
+            try:
+                return response.json()
+            except ValueError:
+                # an html error page or captive portal reply. treat it like a transient server error
+                if attempt == self.max_retries:
+                    raise QuoteProviderError('request to {} returned a body that is not json'.format(url))
+                self._backoff(attempt)
+
+    def _get_batch(self, tickers):
+        """request prices for up to batch_size tickers in one quote call. returns None if batching is unavailable."""
+        body = self._get_json(self.quote_url, params={'symbols': ','.join(ticker.upper() for ticker in tickers)})
+        if body is None:
+            return None
+        prices = {ticker: None for ticker in tickers}
+        by_symbol = {ticker.upper(): ticker for ticker in tickers}
+        for quote in body.get('quoteResponse', {}).get('result', []):
+            ticker = by_symbol.get(quote.get('symbol', '').upper())
+            if ticker is not None and quote.get('regularMarketPrice') is not None:
+                prices[ticker] = float(quote['regularMarketPrice'])
+        return prices
+
+    def _get_single(self, ticker):
+        """request the price of one ticker from the chart api."""
+        body = self._get_json(self.chart_url.format(ticker.upper()), params={'range': '1d', 'interval': '1d'})
+        try:
+            return float(body['chart']['result'][0]['meta']['regularMarketPrice'])
+        except (TypeError, KeyError, IndexError, ValueError):
+            return None
+
+    def get_prices(self, tickers):
+        prices = {}
+        if self.batch_supported:
+            for i in range(0, len(tickers), self.batch_size):
+                batch = self._get_batch(tickers[i:i + self.batch_size])
+                if batch is None:
+                    # the batch endpoint rejected the request (it may require a session crumb). use the chart api.
+                    self.batch_supported = False
+                    prices = {}
+                    break
+                prices.update(batch)
+        if not self.batch_supported:
+            futures = {ticker: self._executor.submit(self._get_single, ticker) for ticker in tickers}
+            prices = {ticker: future.result() for ticker, future in futures.items()}
+        return prices
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+class YahooFinQuoteProvider(QuoteProvider):
+    """
+    YahooFinQuoteProvider wraps yahoo_fin's stock_info.get_live_price, one concurrent call per ticker.
+    """
+
+    name = 'yahoo_fin'
+
+    def __init__(self, max_workers=10):
+        from yahoo_fin import stock_info
+        self._get_live_price = stock_info.get_live_price
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _get_single(self, ticker):
+        try:
+            return float(self._get_live_price(ticker))
+        except Exception:
+            return None
+
+    def get_prices(self, tickers):
+        futures = {ticker: self._executor.submit(self._get_single, ticker) for ticker in tickers}
+        return {ticker: future.result() for ticker, future in futures.items()}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class MockQuoteProvider(QuoteProvider):
+    """
+    MockQuoteProvider generates prices in process with a random walk per ticker. Tickers listed in invalid_tickers
+    never return a price, which is useful for exercising validation and error handling.
+    """
+
+    name = 'mock'
+
+    def __init__(self, seed=None, volatility=0.002, invalid_tickers=()):
+        """
+        :param seed: optional random seed for repeatable price sequences.
+        :param volatility: standard deviation of the relative price change per call.
+        :param invalid_tickers: tickers that should behave as unknown symbols.
+        """
+        self.random = random.Random(seed)
+        self.volatility = volatility
+        self.invalid_tickers = {ticker.upper() for ticker in invalid_tickers}
+        self.prices = {}
+        self.request_count = 0
+
+    def get_prices(self, tickers):
+        self.request_count += 1
+        prices = {}
+        for ticker in tickers:
+            symbol = ticker.upper()
+            if symbol in self.invalid_tickers:
+                prices[ticker] = None
+                continue
+            price = self.prices.get(symbol, 50.0 + 10 * len(self.prices))
+            price = max(0.01, price * (1 + self.random.gauss(0, self.volatility)))
+            self.prices[symbol] = price
+            prices[ticker] = price
+        return prices
+
+
+PROVIDERS = {
+    YahooQuoteProvider.name: YahooQuoteProvider,
+    YahooFinQuoteProvider.name: YahooFinQuoteProvider,
+    MockQuoteProvider.name: MockQuoteProvider,
+}
+
+
+def get_provider(name, **kwargs):
+    """returns a new quote provider instance for the given provider name."""
+    return PROVIDERS[name](**kwargs)
+
+
+def load_validation_cache(path=VALIDATION_CACHE_PATH):
+    """returns the dictionary of provider:ticker to last successful validation time (epoch seconds)."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_validation_cache(cache, path=VALIDATION_CACHE_PATH):
+    """writes the validation cache atomically, so concurrent runs never read a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+def validate_tickers(provider, tickers, path=VALIDATION_CACHE_PATH, ttl=VALIDATION_CACHE_TTL):
+    """
+    validate_tickers checks that every ticker is known to the provider. Tickers validated within the last ttl seconds
+    are trusted without a network call, and the remaining tickers are checked together in one get_prices call.
+    :param provider: quote provider used to look up unvalidated tickers.
+    :param tickers: list of ticker strings.
+    :return: list of tickers the provider does not know.
+    """
+    cache = load_validation_cache(path)
+    now = time.time()
+    unchecked = [ticker for ticker in tickers
+                 if now - cache.get('{}:{}'.format(provider.name, ticker.upper()), 0) > ttl]
+    if not unchecked:
+        return []
+
+    prices = provider.get_prices(unchecked)
+    invalid = [ticker for ticker in unchecked if prices.get(ticker) is None]
+    for ticker in unchecked:
+        if ticker not in invalid:
+            cache['{}:{}'.format(provider.name, ticker.upper())] = now
+    # the mock provider is in process only, so it never needs to persist validation results
+    if provider.name != MockQuoteProvider.name:
+        save_validation_cache(cache, path)
+    return invalid
@@ -1,4 +1,8 @@
-from yahoo_fin import stock_info
+import quote_providers
+import alerts
+import tick_recorder
+import tick_history
+import argparse
 import sys
 import time
 
@@ -7,14 +11,34 @@ Author:         Nick Loden
 
 Last Update:    02/06/2021
 
-Description:    This script will take in a stock ticker and an optional refresh frequency in seconds, and output
-                near real time statistics about the stock specified. This script utilizes the yahoo finance api
-                to obtain the prices for the tickers provided.
-                
-Input:          sys.argv[1] = ticker symbol
+Description:    This script will take in a stock ticker (or a comma separated watchlist of tickers) and an optional
+                refresh frequency in seconds, and output near real time statistics about the stocks specified. Prices are
+                obtained through a pluggable quote provider (see quote_providers.py); by default the yahoo finance
+                api is queried over a pooled session with the whole watchlist batched into as few requests as
+                possible. Ticks are scheduled at a fixed rate so the time spent waiting on the api does not make the
+                refresh interval drift. Tickers that validated successfully are cached for a week, so repeated runs
+                start without an extra validation call. Ticks can be recorded to a compact binary file with --record
+                (see tick_recorder.py), and a recording can be played back through the same display and statistics
+                code with --replay, at the original pace or faster (--speed 10x, or --speed max for no delay at all).
+                Price alert rules (see alerts.py) are evaluated on every tick, live or replayed, and fire through
+                stdout, a file or a webhook.
+
+Input:          sys.argv[1] = ticker symbol, or comma separated ticker symbols (e.g. aapl,msft,goog)
                 sys.argv[2] = optional refresh frequency
-                
-Standard Form:  python real_time_stock.price.py <string: ticker> <int: frequency>
+                --provider  = optional quote provider: yahoo (default), yahoo_fin, or mock (local, no network access)
+                --windows   = optional comma separated rolling statistics windows, in ticks (default: 20)
+                --record    = optional file to append every tick to
+                --replay    = optional recording to play back instead of querying a provider (tickers default to
+                              every ticker in the recording)
+                --speed     = optional replay speed multiplier, e.g. 10x, or max (default: 1x)
+                --alerts    = optional json file of price alert rules
+                --alert-sink = optional alert destination: stdout (default), file:<path> or webhook:<url>. may be
+                              repeated
+
+Standard Form:  python real_time_stock.price.py <string: ticker[,ticker...]> <int: frequency> [--provider <name>]
+                    [--windows <int,int...>] [--record <file>] [--alerts <file> [--alert-sink <sink>...]]
+                python real_time_stock.price.py [string: ticker[,ticker...]] --replay <file> [--speed <Nx|max>]
+                    [--windows <int,int...>] [--alerts <file> [--alert-sink <sink>...]]
 
 Installation/Configuration Guidance:
 
@@ -32,54 +56,140 @@ Installation/Configuration Guidance:
 def validate_input():
     """
     validate_input ensures that the run time arguments provided by the user meet the execution requirements for
-    this script. It ensures that there is at least one argument provided for the ticker, but no more than two provided
-    to account for the ticker and refresh frequency.
-    :return: A list containing at least one element representing a validated ticker string. Said list may contain a
-    second element which will represent the refresh frequency.
+    this script. It ensures that there is at least one ticker provided, and optionally a refresh frequency.
+    :return: A dictionary of keyword arguments for dynamic_stock_price_output: the validated ticker strings, and
+    optionally the refresh frequency, quote provider, rolling statistics windows, record file, replay file, replay
+    speed, alert engine and alert sinks.
     """
 
     # initialize variables
-    validated_args = []
+    validated_args = {}
+
+    parser = argparse.ArgumentParser(description='Near real time stock prices for one or more tickers.')
+    parser.add_argument('tickers', nargs='?', help='ticker symbol, or comma separated ticker symbols (e.g. aapl,msft,goog)')
+    parser.add_argument('frequency', nargs='?', help='optional refresh frequency in seconds (1 - 60)')
+    parser.add_argument('--provider', choices=sorted(quote_providers.PROVIDERS), default=quote_providers.YahooQuoteProvider.name,
+                        help='quote provider (default: yahoo). mock generates prices locally without network access')
+    parser.add_argument('--windows', default='20', help='comma separated rolling statistics windows, in ticks (default: 20)')
+    parser.add_argument('--record', metavar='FILE', help='append every tick to this recording file')
+    parser.add_argument('--replay', metavar='FILE', help='play back a recording instead of querying a quote provider')
+    parser.add_argument('--speed', default='1x', help='replay speed multiplier, e.g. 10x, or max for no delay (default: 1x)')
+    parser.add_argument('--alerts', metavar='FILE', help='json file of price alert rules evaluated on every tick')
+    parser.add_argument('--alert-sink', action='append', metavar='SINK',
+                        help='alert destination: stdout (default), file:<path> or webhook:<url>. may be repeated')
+    args = parser.parse_args()
+
+    if args.replay is not None:
+        if args.record is not None or args.frequency is not None:
+            print("Error: --replay cannot be combined with --record or a refresh frequency.")
+            sys.exit()
+        try:
+            recorded_tickers = list(tick_recorder.read_symbols(args.replay))
+        except (OSError, ValueError) as err:
+            print("Error: Unable to read recording: {}".format(err))
+            sys.exit()
+        if not recorded_tickers:
+            print("Error: The recording does not contain any ticks.")
+            sys.exit()
 
-    if len(sys.argv) < 2 or len(sys.argv) > 3:  # note: sys.arv[0] is counted, so need to up by 1
-        print("Error: You must provide at least one runtime argument.")
-        print("Standard Form: python {} <stock ticker> <optional: refresh frequency>".format(sys.argv[0]))
+        speed = args.speed.lower()
+        if speed == 'max':
+            validated_args['speed'] = 0
+        else:
+            try:
+                validated_args['speed'] = float(speed[:-1] if speed.endswith('x') else speed)
+            except ValueError:
+                validated_args['speed'] = -1
+            if validated_args['speed'] <= 0:
+                print("Error: The replay speed must be a positive multiplier (e.g. 10x) or max.")
+                sys.exit()
+        validated_args['replay'] = args.replay
+        if args.tickers is None:
+            args.tickers = ','.join(recorded_tickers)
+    elif args.tickers is None:
+        print("Error: You must provide at least one ticker.")
         sys.exit()
 
     # validate input for second argument for update frequency if exists
-    if len(sys.argv) == 3:
+    if args.frequency is not None:
         # ensure argument is all numeric characters
-        if not sys.argv[2].isnumeric():
+        if not args.frequency.isnumeric():
             print("Error: The refresh frequency provided must be an integer/whole number.")
             sys.exit()
-        elif int(sys.argv[2]) < 1 or int(sys.argv[2]) > 60:
+        elif int(args.frequency) < 1 or int(args.frequency) > 60:
             print("Error: The refresh frequency provided must be in the range 1 - 60.")
             sys.exit()
 
-        # argument 2 passed validation. add to return list
-        validated_args.append(sys.argv[2])
+        # argument 2 passed validation. add to return dictionary
+        validated_args['frequency'] = args.frequency
 
-    # validate input for first argument for stock ticker
-    # ensure argument is of type string
-    if not sys.argv[1].isalpha():
-        print("Error: The ticker provided must be a string of letters (a - z).")
+    # validate input for first argument for stock ticker(s)
+    tickers = [ticker.strip() for ticker in args.tickers.split(',') if ticker.strip()]
+    if not tickers:
+        print("Error: You must provide at least one ticker.")
         sys.exit()
-    # ensure length of string is greater than 0 and less than 5
-    elif len(sys.argv[1]) < 1 or len(sys.argv[1]) > 5:
-        print("Error: The ticker provided must contain 1 - 5 alpha characters.")
+    for ticker in tickers:
+        # ensure argument is of type string
+        if not ticker.isalpha():
+            print("Error: The ticker provided must be a string of letters (a - z).")
+            sys.exit()
+        # ensure length of string is greater than 0 and less than 5
+        elif len(ticker) < 1 or len(ticker) > 5:
+            print("Error: The ticker provided must contain 1 - 5 alpha characters.")
+            sys.exit()
+
+    # validate rolling statistics windows
+    windows = [window.strip() for window in args.windows.split(',') if window.strip()]
+    if not windows or not all(window.isnumeric() and 1 < int(window) <= 100000 for window in windows):
+        print("Error: The windows provided must be whole numbers in the range 2 - 100000.")
         sys.exit()
+    validated_args['windows'] = sorted({int(window) for window in windows})
 
-    # test single yahoo finance api call to see if ticker provided is legit
-    try:
-        test_ticker = "{:.2f}".format(stock_info.get_live_price(sys.argv[1]))
-    except Exception:
-        print("Error: Invalid ticker provided.")
+    if 'replay' in validated_args:
+        # a replay only needs the tickers to exist in the recording, not at the quote provider
+        missing_tickers = [ticker for ticker in tickers if ticker.upper() not in recorded_tickers]
+        if missing_tickers:
+            print("Error: Ticker not found in recording: {}".format(', '.join(missing_tickers)))
+            sys.exit()
+    else:
+        provider = quote_providers.get_provider(args.provider)
+
+        # check the tickers provided are legit. recently validated tickers are trusted without an api call, and the
+        # rest are checked together in one batched request
+        try:
+            invalid_tickers = quote_providers.validate_tickers(provider, tickers)
+        except quote_providers.QuoteProviderError as err:
+            print("Error: Unable to validate tickers: {}".format(err))
+            sys.exit()
+        if invalid_tickers:
+            print("Error: Invalid ticker provided: {}".format(', '.join(invalid_tickers)))
+            sys.exit()
+        validated_args['provider'] = provider
+
+    # argument 1 passed validation
+    validated_args['tickers'] = tickers
+
+    # compile alert rules once for the watchlist, and open their sinks
+    if args.alerts is not None:
+        try:
+            validated_args['alert_engine'] = alerts.AlertEngine(alerts.load_rules(args.alerts), tickers)
+            validated_args['alert_sinks'] = [alerts.get_sink(sink) for sink in args.alert_sink or ['stdout']]
+        except (alerts.AlertRuleError, OSError) as err:
+            print("Error: {}".format(err))
+            sys.exit()
+    elif args.alert_sink:
+        print("Error: --alert-sink requires --alerts.")
         sys.exit()
 
-    # argument 1 passed validation. add to first position of return list
-    validated_args.insert(0, sys.argv[1])
+    # open the recording last, so a run rejected above never creates the file. an existing recording is checked here
+    if args.record is not None:
+        try:
+            validated_args['record'] = tick_recorder.TickRecorder(args.record)
+        except (ValueError, OSError) as err:
+            print("Error: Unable to open recording: {}".format(err))
+            sys.exit()
 
-    # return list of vetted argument(s)
+    # return dictionary of vetted argument(s)
     return validated_args
 
 
@@ -102,80 +212,222 @@ def symbol_checker():
     return up_arrow, down_arrow
 
 
-def get_stock_price(ticker):
+def get_stock_price(ticker, provider=None):
     """
-    get_stock_price will utilize the yahoo_fin library and call the get_live_price method with the ticker passed into
-    this function.
+    get_stock_price will look up the live price of a single ticker through the quote provider.
     :param ticker: this is the first run time parameter provided by the user that designates the stock to be queried.
+    :param provider: the quote provider used to look up prices (defaults to the yahoo provider).
     :return: the current price of the stock specified in string form. This string will be represented as a fractional
     value with 2 decimal point precision.
     """
 
-    return "{:.2f}".format(stock_info.get_live_price(ticker))
+    provider = provider or quote_providers.YahooQuoteProvider()
+    return "{:.2f}".format(provider.get_prices([ticker])[ticker])
+
+
+def get_stock_prices(tickers, provider):
+    """
+    get_stock_prices will look up the price of every ticker in the watchlist through the quote provider, which batches
+    them into as few upstream requests as it can.
+    :param tickers: list of stock tickers to query.
+    :param provider: the quote provider used to look up prices.
+    :return: dictionary of ticker to price (float), or None if the price could not be obtained.
+    """
+
+    try:
+        return provider.get_prices(tickers)
+    except quote_providers.QuoteProviderError:
+        return {ticker: None for ticker in tickers}
+
+
+def render_watchlist(rows, redraw, timestamp=None):
+    """
+    render_watchlist will output one line per ticker, redrawing the previous lines in place.
+    :param rows: list of (ticker, price, arrow, stats) tuples to display, where stats is a list of (window, stats
+    dictionary) pairs from tick_history.TickHistory.stats.
+    :param redraw: True if the lines were already printed once and should be overwritten.
+    :param timestamp: time of the tick (epoch seconds) shown on every line. Defaults to the current time.
+    :return: None. Content is output to standard out.
+    """
+
+    tick_time = time.strftime('%H:%M:%S', time.localtime(timestamp))
+    if redraw:
+        sys.stdout.write('\033[{}F'.format(len(rows)))  # move cursor to the start of the first ticker line
+    for ticker, price, arrow, stats in rows:
+        price_str = '{:.2f}'.format(price) if price is not None else '--'
+        line = '{:<6} | Time: {} | Price: {:>10} {:<1}'.format(ticker.upper(), tick_time, price_str, arrow)
+        for window, window_stats in stats:
+            if window_stats is not None:
+                line += ' | {}t avg {:.2f} lo {:.2f} hi {:.2f} sd {:.2f} chg {:+.2f}% ema {:.2f}'.format(
+                    window, window_stats['mean'], window_stats['min'], window_stats['max'], window_stats['stddev'],
+                    window_stats['pct_change'], window_stats['ema'])
+        sys.stdout.write('\033[2K' + line + '\n')
+    sys.stdout.flush()
+
+
+def live_ticks(tickers, frequency, provider):
+    """
+    live_ticks queries the quote provider for the whole watchlist on a fixed schedule.
+    :param tickers: list of stock tickers to query.
+    :param frequency: refresh frequency in seconds.
+    :param provider: the quote provider used to look up prices.
+    :return: generator of (timestamp, {ticker: price}) tuples, one per refresh.
+    """
+
+    # schedule ticks against the monotonic clock so time spent on api calls does not delay the next refresh
+    next_tick = time.monotonic()
+    while True:
+        # call get_stock_prices function to obtain current stock prices for the whole watchlist
+        yield time.time(), get_stock_prices(tickers, provider)
+
+        # sleep until the next scheduled tick. if a tick overran, skip ahead instead of bursting to catch up
+        next_tick += frequency
+        now = time.monotonic()
+        if next_tick < now:
+            next_tick = now + frequency - ((now - next_tick) % frequency)
+        time.sleep(next_tick - now)
 
 
-def dynamic_stock_price_output(ticker, frequency=2):
+def replay_ticks(tickers, path, speed=1.0):
     """
-    dynamic_stock_price_output will consume both the ticker and frequency variables as input, and then output
+    replay_ticks plays back a recording made with --record, preserving the original spacing between refreshes.
+    :param tickers: list of stock tickers to play back. ticks of other tickers in the recording are skipped.
+    :param path: recording file path.
+    :param speed: playback speed multiplier. 0 plays the recording back as fast as possible.
+    :return: generator of (timestamp, {ticker: price}) tuples, one per recorded refresh.
+    """
+
+    symbols = {ticker.upper(): ticker for ticker in tickers}
+    start_time = None
+    start = time.monotonic()
+    for timestamp, recorded_prices in tick_recorder.read_rounds(path):
+        prices = {symbols[symbol]: price for symbol, price in recorded_prices.items() if symbol in symbols}
+        if not prices:
+            continue
+        if start_time is None:
+            start_time = timestamp
+        if speed:
+            delay = start + (timestamp - start_time) / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        yield timestamp, prices
+
+
+def dynamic_stock_price_output(tickers, frequency=2, provider=None, windows=(20,), record=None, replay=None,
+                               speed=1.0, alert_engine=None, alert_sinks=()):
+    """
+    dynamic_stock_price_output will consume both the tickers and frequency variables as input, and then output
     dynamic text to standard out and continue to update the time and stock price values until the program is terminated
     with a control+c input.
-    :param ticker: this is the first run time parameter provided by the user that designates the stock to be queried.
+    :param tickers: this is the first run time parameter provided by the user that designates the stock(s) to be queried.
+    Either a single ticker string or a list of tickers.
     :param frequency: this is the second optional run time parameter provided by the user that designates the refresh
     frequency of the stock price and time. If a value of 5 is provided, then the yahoo finance api will be called
     every 5 seconds, and the result will be output to standard out.
+    :param provider: the quote provider used to look up prices (defaults to the yahoo provider).
+    :param windows: rolling statistics windows, in ticks, tracked for every ticker.
+    :param record: optional recording file every tick is appended to, as a path or an open tick_recorder.TickRecorder.
+    :param replay: optional recording file to play back instead of querying the quote provider.
+    :param speed: replay speed multiplier (0 for no delay between refreshes).
+    :param alert_engine: optional alerts.AlertEngine evaluated on every tick.
+    :param alert_sinks: alerts.AlertSink instances that fired alerts are sent to.
     :return: None. Nothing is directly returned from this function, but there will be content output to standard out.
     """
 
     # declare function variables
-    old_price = 0.0
-    new_price = 0.0
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    old_prices = {ticker: 0.0 for ticker in tickers}
+    # the histories also track any windows the alert rules need, even if they are not displayed
+    history_windows = set(windows) | (alert_engine.windows() if alert_engine else set())
+    histories = {ticker: tick_history.TickHistory(history_windows) for ticker in tickers}
     up_arrow, down_arrow = symbol_checker()
+    frequency = int(frequency)
+    if isinstance(record, tick_recorder.TickRecorder):
+        recorder = record
+    else:
+        recorder = tick_recorder.TickRecorder(record) if record else None
+    if replay:
+        provider = None
+        source = replay_ticks(tickers, replay, speed)
+    else:
+        provider = provider or quote_providers.YahooQuoteProvider()
+        source = live_ticks(tickers, frequency, provider)
 
     # print out static information:
     print(' ------------------------')
     print('| Real Time Stock Prices |')
     print(' ------------------------')
     print('(press control+c to quit.)')
-    print('Ticker:  {}'.format(ticker.upper()))
+    print('Ticker:  {}'.format(', '.join(ticker.upper() for ticker in tickers)))
     print('Date:    {}'.format(time.strftime('%m/%d/%Y')))
-    print('Refresh: {}'.format(frequency) + ' second(s)')
-
-    # loop until keyboard interrupt is detected (control+c)
-    while True:
-        try:
-            # call get_stock_price function to obtain current stock price
-            new_price = float(get_stock_price(ticker))
-
-            # compare current price against previous price
-            if new_price > old_price:
-                arrow = up_arrow  # up arrow symbol
-            elif new_price < old_price:
-                arrow = down_arrow  # down arrow symbol
-            else:
-                arrow = ''  # blank arrow indicating no price change
-
-            # output dynamic text with current date/time stamp and price with arrow
-            print('\r', end='')
-            print("Time: {} | Price: {:.2f} {}".format(time.strftime('%H:%M:%S'), new_price, arrow), end='', flush=True)
-
-            # original way to display dynamic text output - python 2.x preferred way
-            # output_string = "\rTime: {} | Price: {:.2f} {}".format(time.strftime('%H:%M:%S'), new_price, arrow)
-            # sys.stdout.write(output_string)
-            # sys.stdout.flush()
+    if replay:
+        print('Replay:  {} at {}'.format(replay, '{:g}x'.format(speed) if speed else 'max speed'))
+    else:
+        print('Refresh: {}'.format(frequency) + ' second(s)')
+    if recorder:
+        print('Record:  {}'.format(recorder.path))
+
+    redraw = False
+    tick_count = 0
+    alert_count = 0
+    start = time.monotonic()
+
+    # loop until the source runs out or keyboard interrupt is detected (control+c)
+    try:
+        for timestamp, new_prices in source:
+            rows = []
+            fired = []
+            for ticker in tickers:
+                new_price = new_prices.get(ticker)
+                old_price = old_prices[ticker]
+
+                # compare current price against previous price
+                if new_price is None:
+                    arrow = '?'  # price could not be obtained this tick
+                elif new_price > old_price:
+                    arrow = up_arrow  # up arrow symbol
+                elif new_price < old_price:
+                    arrow = down_arrow  # down arrow symbol
+                else:
+                    arrow = ''  # blank arrow indicating no price change
+
+                # set old price to new price to compare for next loop cycle, and record the tick in the history
+                if new_price is not None:
+                    old_prices[ticker] = new_price
+                    histories[ticker].append(timestamp, new_price)
+                    tick_count += 1
+                    if recorder:
+                        recorder.write(timestamp, ticker, new_price)
+                    if alert_engine:
+                        fired.extend(alert_engine.evaluate(ticker, timestamp, histories[ticker]))
+                stats = [(window, histories[ticker].stats(window)) for window in windows]
+                rows.append((ticker, new_price if new_price is not None else old_price or None, arrow, stats))
+
+            # alerts printed to the terminal go above the watchlist, which is then printed fresh below them
+            if alerts.dispatch(fired, alert_sinks):
+                redraw = False
+            alert_count += len(fired)
+
+            # output dynamic text with current date/time stamp and price with arrow for every ticker
+            render_watchlist(rows, redraw, timestamp)
+            redraw = True
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if recorder:
+            recorder.close()
+        if provider:
+            provider.close()
+        for sink in alert_sinks:
+            sink.close()
 
-            # set old price to new price to compare for next loop cycle
-            old_price = new_price
-            time.sleep(int(frequency))  # sleep for 2 seconds
-        except KeyboardInterrupt:
-            break
+    if replay:
+        elapsed = time.monotonic() - start
+        print('Replayed {} ticks in {:.2f} second(s) ({:.0f} ticks/second), {} alert(s) fired'.format(
+            tick_count, elapsed, tick_count / elapsed if elapsed else 0, alert_count))
 
 
 if __name__ == '__main__':
-    # validate run time arguments, and pass them back in list
-    input_list = validate_input()
-
-    # check length of argument list, and call primary stock price function with appropriate amount of arguments.
-    if len(input_list) == 1:  # only one argument provided
-        dynamic_stock_price_output(input_list[0])
-    elif len(input_list) == 2:  # two arguments provided
-        dynamic_stock_price_output(input_list[0], input_list[1])
+    # validate run time arguments, and pass them back as keyword arguments for the primary stock price function
+    dynamic_stock_price_output(**validate_input())
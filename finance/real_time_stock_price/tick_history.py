@@ -0,0 +1,178 @@
+from collections import deque
+from array import array
+import math
+
+"""
+Author:         Nick Loden
+
+Last Update:    10/18/2026
+
+Description:    This module keeps a bounded history of (timestamp, price) ticks per stock ticker in a fixed size,
+                array backed ring buffer, and maintains rolling statistics over one or more tick count windows.
+                Every statistic (mean, min, max, standard deviation, percent change and EMA) is updated
+                incrementally as each tick arrives, so the cost per tick does not depend on the window length and
+                memory stays bounded no matter how long the monitor runs.
+
+Input:          None
+
+Standard Form:  import tick_history
+                history = tick_history.TickHistory(windows=[20, 100])
+                history.append(time.time(), 123.45)
+                history.stats(20)
+"""
+
+
+# running sums are recomputed from the buffer every RESYNC_INTERVAL ticks to stop floating point error accumulating
+RESYNC_INTERVAL = 10000
+
+
+class RollingWindow:
+    """
+    RollingWindow maintains statistics over the most recent `size` prices. The caller passes in the price that falls
+    out of the window on each update, so the window itself stores no prices beyond its min/max candidates.
+    """
+
+    def __init__(self, size):
+        """
+        :param size: number of ticks in the window.
+        """
+        self.size = size
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.ema = None
+        self.alpha = 2.0 / (size + 1)
+        # monotonic deques of (sequence number, price) give amortized O(1) min/max
+        self._min = deque()
+        self._max = deque()
+
+    def update(self, seq, price, evicted=None):
+        """
+        update adds a price to the window.
+        :param seq: sequence number of the tick (increments by one per tick).
+        :param price: the new price.
+        :param evicted: the price leaving the window, or None while the window is still filling.
+        :return: None
+        """
+        self.total += price
+        self.total_sq += price * price
+        if evicted is None:
+            self.count += 1
+        else:
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((seq, price))
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((seq, price))
+        oldest_seq = seq - self.size + 1
+        if self._min[0][0] < oldest_seq:
+            self._min.popleft()
+        if self._max[0][0] < oldest_seq:
+            self._max.popleft()
+
+        self.ema = price if self.ema is None else self.ema + self.alpha * (price - self.ema)
+
+    def resync(self, prices):
+        """resync recomputes the running sums exactly from the prices currently in the window."""
+        self.total = math.fsum(prices)
+        self.total_sq = math.fsum(price * price for price in prices)
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def stddev(self):
+        if self.count < 2:
+            return 0.0 if self.count else None
+        mean = self.total / self.count
+        # clamp tiny negative values caused by floating point cancellation
+        return math.sqrt(max(0.0, self.total_sq / self.count - mean * mean))
+
+    def minimum(self):
+        return self._min[0][1] if self._min else None
+
+    def maximum(self):
+        return self._max[0][1] if self._max else None
+
+
+class TickHistory:
+    """
+    TickHistory stores the most recent ticks of one stock ticker in a ring buffer sized to the largest window, and
+    keeps a RollingWindow per configured window size.
+    """
+
+    def __init__(self, windows=(20,)):
+        """
+        :param windows: iterable of window sizes, in ticks.
+        """
+        self.windows = {size: RollingWindow(size) for size in sorted(set(windows))}
+        self.capacity = max(self.windows)
+        self.timestamps = array('d', [0.0]) * self.capacity
+        self.prices = array('d', [0.0]) * self.capacity
+        self.seq = -1  # sequence number of the newest tick
+
+    def __len__(self):
+        return min(self.seq + 1, self.capacity)
+
+    def _slot(self, seq):
+        return seq % self.capacity
+
+    def append(self, timestamp, price):
+        """
+        append records a tick and updates every rolling window.
+        :param timestamp: tick time (epoch seconds).
+        :param price: tick price.
+        :return: None
+        """
+        self.seq += 1
+        for size, window in self.windows.items():
+            # the price leaving a window is still in the buffer, since the buffer is as long as the largest window
+            evicted = self.prices[self._slot(self.seq - size)] if self.seq >= size else None
+            window.update(self.seq, price, evicted)
+        slot = self._slot(self.seq)
+        self.timestamps[slot] = timestamp
+        self.prices[slot] = price
+        if self.seq and self.seq % RESYNC_INTERVAL == 0:
+            for window in self.windows.values():
+                window.resync([self.price_at(ticks_ago) for ticks_ago in range(window.count)])
+
+    def price_at(self, ticks_ago):
+        """returns the price recorded `ticks_ago` ticks before the newest tick, or None if it is no longer stored."""
+        if ticks_ago > self.seq or ticks_ago >= self.capacity:
+            return None
+        return self.prices[self._slot(self.seq - ticks_ago)]
+
+    def last(self):
+        """returns the newest (timestamp, price) tick, or None if no tick was recorded yet."""
+        if self.seq < 0:
+            return None
+        slot = self._slot(self.seq)
+        return self.timestamps[slot], self.prices[slot]
+
+    def ticks(self):
+        """returns the stored (timestamp, price) ticks, oldest first."""
+        start = max(0, self.seq - self.capacity + 1)
+        return [(self.timestamps[self._slot(seq)], self.prices[self._slot(seq)]) for seq in range(start, self.seq + 1)]
+
+    def stats(self, size):
+        """
+        stats returns the rolling statistics for one of the configured windows.
+        :param size: the window size, in ticks.
+        :return: dictionary with mean, min, max, stddev, pct_change (vs. the oldest price in the window) and ema.
+        """
+        window = self.windows[size]
+        if window.count == 0:
+            return None
+        oldest = self.price_at(window.count - 1)
+        newest = self.price_at(0)
+        return {
+            'mean': window.mean(),
+            'min': window.minimum(),
+            'max': window.maximum(),
+            'stddev': window.stddev(),
+            'pct_change': (newest - oldest) / oldest * 100 if oldest else 0.0,
+            'ema': window.ema,
+        }
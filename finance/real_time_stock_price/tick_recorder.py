@@ -0,0 +1,179 @@
+import struct
+import time
+import os
+
+"""
+Author:         Nick Loden
+
+Last Update:    10/18/2026
+
+Description:    This module records stock ticks to a compact, append only binary file and reads them back for replay.
+                Every record starts with a one byte type. A symbol record assigns a 16 bit id to a ticker the first
+                time it is seen in a file, and every tick record after that stores only (timestamp, id, price) in
+                19 bytes. Writes are buffered and fsync'd in batches (every few seconds or every N ticks) so
+                recording does not add a disk flush to every tick.
+
+Input:          None
+
+Standard Form:  import tick_recorder
+                with tick_recorder.TickRecorder('ticks.bin') as recorder:
+                    recorder.write(time.time(), 'aapl', 123.45)
+                for timestamp, prices in tick_recorder.read_rounds('ticks.bin'):
+                    ...
+"""
+
+
+MAGIC = b'TICKREC1'
+SYMBOL_RECORD = 0
+TICK_RECORD = 1
+RECORD_TYPE = struct.Struct('<B')
+SYMBOL = struct.Struct('<HB')  # ticker id, ticker name length (name bytes follow)
+TICK = struct.Struct('<dHd')  # timestamp, ticker id, price
+
+
+class TickRecorder:
+    """
+    TickRecorder appends ticks to a recording file, fsyncing in batches.
+    """
+
+    def __init__(self, path, fsync_interval=5.0, fsync_ticks=1000):
+        """
+        :param path: recording file path. an existing recording is appended to.
+        :param fsync_interval: maximum number of seconds between fsyncs.
+        :param fsync_ticks: maximum number of ticks written between fsyncs.
+        """
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.fsync_ticks = fsync_ticks
+        self.ids = {}
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            # continue with the ticker ids already assigned in the existing file, dropping any partial last record
+            end = len(MAGIC)
+            for record_type, values, end in read_raw_records(path):
+                if record_type == SYMBOL_RECORD:
+                    self.ids[values[1]] = values[0]
+            self.file = open(path, 'r+b')
+            self.file.truncate(end)
+            self.file.seek(end)
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(MAGIC)
+            self.file.flush()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def write(self, timestamp, ticker, price):
+        """
+        write appends one tick to the recording.
+        :param timestamp: tick time (epoch seconds). ticks of the same refresh should share one timestamp.
+        :param ticker: ticker symbol.
+        :param price: tick price.
+        :return: None
+        """
+        ticker = ticker.upper()
+        ticker_id = self.ids.get(ticker)
+        if ticker_id is None:
+            ticker_id = len(self.ids)
+            self.ids[ticker] = ticker_id
+            name = ticker.encode('ascii')
+            self.file.write(RECORD_TYPE.pack(SYMBOL_RECORD) + SYMBOL.pack(ticker_id, len(name)) + name)
+        self.file.write(RECORD_TYPE.pack(TICK_RECORD) + TICK.pack(timestamp, ticker_id, price))
+        self._pending += 1
+        if self._pending >= self.fsync_ticks or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """sync flushes buffered ticks and fsyncs the file."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """close syncs any pending ticks and closes the file."""
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_raw_records(path):
+    """
+    read_raw_records yields every complete record in a recording. a partial record at the end of the file (left by an
+    interrupted write) is ignored.
+    :param path: recording file path.
+    :return: generator of (record type, values, end offset) tuples, where values is (ticker id, ticker) for symbol
+    records and (timestamp, ticker id, price) for tick records.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('{} is not a tick recording'.format(path))
+        while True:
+            record_type = f.read(RECORD_TYPE.size)
+            if not record_type:
+                break
+            if record_type[0] == SYMBOL_RECORD:
+                data = f.read(SYMBOL.size)
+                if len(data) < SYMBOL.size:
+                    break
+                ticker_id, length = SYMBOL.unpack(data)
+                name = f.read(length)
+                if len(name) < length:
+                    break
+                yield SYMBOL_RECORD, (ticker_id, name.decode('ascii')), f.tell()
+            elif record_type[0] == TICK_RECORD:
+                data = f.read(TICK.size)
+                if len(data) < TICK.size:
+                    break
+                yield TICK_RECORD, TICK.unpack(data), f.tell()
+            else:
+                raise ValueError('corrupt record in {}'.format(path))
+
+
+def read_records(path):
+    """
+    read_records yields every tick in a recording, in the order it was written.
+    :param path: recording file path.
+    :return: generator of (timestamp, ticker, price) tuples.
+    """
+    names = {}
+    for record_type, values, _ in read_raw_records(path):
+        if record_type == SYMBOL_RECORD:
+            ticker_id, ticker = values
+            names[ticker_id] = ticker
+        else:
+            timestamp, ticker_id, price = values
+            yield timestamp, names[ticker_id], price
+
+
+def read_symbols(path):
+    """returns a dictionary of ticker to ticker id for every ticker in a recording, in order of first appearance."""
+    symbols = {}
+    for record_type, values, _ in read_raw_records(path):
+        if record_type == SYMBOL_RECORD:
+            ticker_id, ticker = values
+            symbols[ticker] = ticker_id
+    return symbols
+
+
+def read_rounds(path):
+    """
+    read_rounds groups consecutive ticks that share a timestamp into one refresh round.
+    :param path: recording file path.
+    :return: generator of (timestamp, {ticker: price}) tuples.
+    """
+    current_time = None
+    prices = {}
+    for timestamp, ticker, price in read_records(path):
+        if timestamp != current_time and prices:
+            yield current_time, prices
+            prices = {}
+        current_time = timestamp
+        prices[ticker] = price
+    if prices:
+        yield current_time, prices
@@ -0,0 +1,99 @@
+###
+# standard form:
+#   python benchmark_startup.py [--runs N] [--top N] [--max-ms MILLISECONDS] [-- <get-cfb-stats.py args>]
+# examples:
+#   python benchmark_startup.py
+#   python benchmark_startup.py --max-ms 150
+#   python benchmark_startup.py -- --position qb --teams "purdue" --offline
+# notes:
+#   runs get-cfb-stats.py under `python -X importtime` (with --help by default, so nothing is fetched) and reports
+#   the cold-start import cost per top-level module. with --max-ms the script exits non-zero if the total import
+#   time exceeds the budget, so it can be used to catch startup regressions.
+###
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "get-cfb-stats.py")
+
+
+def parse_args():
+    """
+    Parse command-line arguments for the benchmark.
+    Returns:
+        argparse.Namespace: Parsed arguments with 'runs', 'top', 'max_ms' and 'script_args' attributes.
+    """
+    parser = argparse.ArgumentParser(description="Cold-start import time benchmark for get-cfb-stats.py")
+    parser.add_argument('--runs', type=int, default=5, help='Number of runs; the fastest run is reported')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest top-level imports to list')
+    parser.add_argument('--max-ms', type=float, help='Fail if total import time exceeds this many milliseconds')
+    parser.add_argument('script_args', nargs='*', help='Arguments passed to get-cfb-stats.py (default: --help)')
+    return parser.parse_args()
+
+
+def parse_importtime(output):
+    """
+    Parse `-X importtime` output into cumulative times for top-level imports.
+    Args:
+        output (str): stderr of a `python -X importtime` run.
+    Returns:
+        dict: Module name -> cumulative import time in microseconds, for modules imported at the top level.
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # nested imports are indented under the module that triggered them
+        if name.startswith("  ") or name.strip() in modules:
+            continue
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def run_once(script_args):
+    """
+    Run get-cfb-stats.py once under -X importtime.
+    Returns:
+        tuple: (wall time in seconds, dict of top-level module -> cumulative import time in microseconds)
+    """
+    env = dict(os.environ)
+    env.setdefault("CFB_API_KEY", "benchmark")
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", SCRIPT_PATH] + script_args,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    return time.perf_counter() - start, parse_importtime(result.stderr)
+
+
+def main():
+    """
+    Main entry point: run the benchmark and print the fastest run's import breakdown.
+    Returns:
+        None
+    """
+    args = parse_args()
+    script_args = args.script_args or ["--help"]
+    runs = [run_once(script_args) for _ in range(args.runs)]
+    wall_time, modules = min(runs, key=lambda run: run[0])
+    total_ms = sum(modules.values()) / 1000
+
+    print(f"get-cfb-stats.py {' '.join(script_args)}")
+    print(f"Wall time (best of {args.runs}): {wall_time * 1000:.1f} ms")
+    print(f"Total import time: {total_ms:.1f} ms\n")
+    for name, cumulative in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:8.1f} ms  {name}")
+
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"\nError: import time {total_ms:.1f} ms exceeds the {args.max_ms:.1f} ms budget.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
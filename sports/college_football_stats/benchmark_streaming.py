@@ -0,0 +1,90 @@
+###
+# standard form:
+#   python benchmark_streaming.py [--records N] [--position qb]
+# notes:
+#   compares peak python memory of get_team_stats() with and without --stream on a synthetic team payload.
+#   the payload is served from a temporary response cache, so no API key or network access is needed.
+###
+import os
+import time
+import random
+import tempfile
+import argparse
+import tracemalloc
+import importlib.util
+
+# the stats script reads its API key at import time; a placeholder is enough when only reading the cache
+os.environ.setdefault("CFB_API_KEY", "benchmark")
+spec = importlib.util.spec_from_file_location("cfb_stats", os.path.join(os.path.dirname(os.path.abspath(__file__)), "get-cfb-stats.py"))
+cfb_stats = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cfb_stats)
+
+POSITIONS = ["QB", "RB", "WR", "TE", "PK", "DB", "LB", "DL", "OL"]
+STAT_TYPES = {"passing": ["ATT", "YDS", "TD", "INT"], "rushing": ["CAR", "YDS", "TD"], "receiving": ["REC", "YDS", "TD"], "defensive": ["TOT", "SOLO", "SACKS"]}
+
+
+def parse_args():
+    """
+    Parse command-line arguments for the benchmark.
+    Returns:
+        argparse.Namespace: Parsed arguments with 'records' and 'position' attributes.
+    """
+    parser = argparse.ArgumentParser(description="Peak memory benchmark for streamed team stat parsing")
+    parser.add_argument('--records', type=int, default=200000, help='Number of synthetic stat records in the payload')
+    parser.add_argument('--position', default='qb', help='Position to keep when streaming')
+    return parser.parse_args()
+
+
+def make_records(count):
+    """
+    Build a synthetic API payload with the same shape as /stats/player/season.
+    Returns:
+        list: Stat record dictionaries.
+    """
+    rng = random.Random(0)
+    records = []
+    for i in range(count):
+        category = rng.choice(list(STAT_TYPES))
+        records.append({
+            "season": cfb_stats.CURRENT_SEASON,
+            "playerId": str(i // 8),
+            "player": f"Player {i // 8}",
+            "position": POSITIONS[(i // 8) % len(POSITIONS)],
+            "team": "Benchmark State",
+            "conference": "Benchmark",
+            "category": category,
+            "statType": rng.choice(STAT_TYPES[category]),
+            "stat": str(rng.randint(0, 500))
+        })
+    return records
+
+
+def measure(label, func):
+    """Run func under tracemalloc and print its wall time and peak allocated memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    frame = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} rows: {len(frame):>8} | time: {elapsed:6.2f} s | peak memory: {peak / 1000000:8.1f} MB")
+
+
+def main():
+    """
+    Main entry point: cache a synthetic payload, then parse it with and without streaming.
+    Returns:
+        None
+    """
+    args = parse_args()
+    team = "benchmark%20state"
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = cfb_stats.ResponseCache(cache_dir)
+        cache.put(cfb_stats.CURRENT_SEASON, team, make_records(args.records))
+        print(f"Payload: {args.records} records, keeping position {args.position.upper()}\n")
+        measure("full", lambda: cfb_stats.get_team_stats(team, cache=cache, offline=True))
+        measure("streamed", lambda: cfb_stats.get_team_stats(team, cache=cache, offline=True, stream=True, positions={args.position.upper()}))
+
+
+if __name__ == "__main__":
+    main()
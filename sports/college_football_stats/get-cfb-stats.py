@@ -1,16 +1,32 @@
 ###
 # standard form:
 #   python get-cfb-stats.py --position [qb|rb|wr|te|pk|all] --teams "team name1" "team name2" ... \
+#     [--years YEAR|START-END ...] [--concurrency N] [--stream] \
+#     [--output table|csv|json|ndjson|parquet] [--output-file PATH] [--watch SECONDS] [--cache-dir DIR] [--cache-ttl SECONDS] [--refresh | --offline] \
 #     [--input-csv "/path/to/player_list.csv"] \
 #     [-input-google-sheet-id "sheet id" --input-google-sheet-range "sheet_range" --input-google-sheet-auth-path "/path/to/client_secret.json"]
 # examples:
 #   python get-cfb-stats.py --position wr --teams "purdue" "indiana"
 #   python get-cfb-stats.py --position qb --teams "kansas state" "iowa state" --input-csv "/path/to/player_list.csv"
+#   python get-cfb-stats.py --position rb --teams "georgia" --years 2019-2025
 #   python get-cfb-stats.py --position qb --teams "kansas state" ... \
 #      --input-google-sheet-id "<sheet_id>" \
 #      --input-google-sheet-range "<sheet_range>" \
 #      --input-google-sheet-auth-path "/path/to/client_secret.json"
 # notes:
+#   teams are fetched concurrently (default 4 at a time) over a shared, pooled http session. a team that fails
+#   to download is reported at the end of the run instead of aborting the remaining teams.
+#   api responses are cached on disk per (year, team) for --cache-ttl seconds (default 6 hours). once expired, the
+#   cached copy is revalidated with ETag/If-Modified-Since. --refresh bypasses the cache, --offline never hits the network.
+#   --stream decodes each team's response incrementally and drops records for other positions or unlisted players
+#   before they are materialized, which keeps peak memory flat for large --position all / multi-team queries.
+#   --output defaults to a table when stdout is a terminal and csv otherwise. machine-readable formats are written
+#   one player per row (stats as columns) without building the transposed table; parquet requires --output-file.
+#   --watch keeps running and re-polls every SECONDS, but only for teams with a game in progress. unchanged responses
+#   (HTTP 304) are not parsed again, and only the positions whose stats changed are re-rendered.
+#   completed seasons (before the current season) never change, so once cached they are not requested again.
+#   google sheet input only downloads the requested range, and the parsed roster is cached per sheet revision.
+#   --input-google-sheet-local-dir reads csv exports from disk instead of google (one <worksheet>.csv per sheet id dir).
 #   if --input-csv or -input-google-sheet* are provided, only players listed in the input sources will be included in the output.
 ###
 import os
@@ -18,14 +34,11 @@ import sys
 import csv
 import argparse
 import requests
-import pandas
-import collections
-import tabulate
-import gspread
-import rapidfuzz
-from oauth2client.file import Storage
-from oauth2client import tools
-from oauth2client.client import flow_from_clientsecrets
+import json
+import time
+import zlib
+import sqlite3
+import concurrent.futures
 
 
 # extract API key from environment variable
@@ -35,9 +48,41 @@ if not API_KEY:
     sys.exit(1)
 
 
+# note: pandas, tabulate, rapidfuzz, ijson, gspread and oauth2client are imported inside the functions that use them,
+# so a run only pays the import cost of the features it actually exercises (see benchmark_startup.py).
+
 # globals
 headers = {"Authorization": f"Bearer {API_KEY}"}
-base_url = "https://api.collegefootballdata.com/stats/player/season?year=2025&team="
+CURRENT_SEASON = 2025
+base_url = "https://api.collegefootballdata.com/stats/player/season?year={year}&team="
+scoreboard_url = "https://api.collegefootballdata.com/scoreboard"
+DEFAULT_CONCURRENCY = 4
+ALL_POSITIONS = ["qb", "rb", "wr", "te", "pk"]
+OUTPUT_FORMATS = ["table", "csv", "json", "ndjson", "parquet"]
+STAT_RECORD_COLUMNS = ["season", "playerId", "player", "position", "team", "conference", "category", "statType", "stat"]
+CATEGORICAL_STAT_COLUMNS = ["player", "position", "team", "conference", "category", "statType"]
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "cfb-stats")
+DEFAULT_CACHE_TTL = 6 * 60 * 60  # seconds
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes
+
+
+def parse_years(value):
+    """
+    Parse a season argument into a list of years.
+    Args:
+        value (str): A single year ("2024") or an inclusive range ("2019-2025").
+    Returns:
+        list: Years covered by the argument, in ascending order.
+    """
+    start, _, end = value.partition("-")
+    try:
+        start = int(start)
+        end = int(end) if end else start
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid year or year range: '{value}'")
+    if start > end:
+        raise argparse.ArgumentTypeError(f"year range must be ascending: '{value}'")
+    return list(range(start, end + 1))
 
 
 def parse_args():
@@ -49,10 +94,23 @@ def parse_args():
     parser = argparse.ArgumentParser(description="College Football Player Stats Comparison")
     parser.add_argument('--position', required=True, help='Player position: qb, rb, wr, te, pk, all')
     parser.add_argument('--teams', nargs='+', required=True, help='List of team names (in quotes if spaces)')
+    parser.add_argument('--years', nargs='+', type=parse_years, default=[[CURRENT_SEASON]], help=f'Seasons to compare, as years or ranges e.g. 2019-2025 (default: {CURRENT_SEASON})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help=f'Max number of teams fetched at once (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help=f'Directory for the on-disk API response cache (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-ttl', type=int, default=DEFAULT_CACHE_TTL, help=f'Seconds a cached response is used without revalidation (default: {DEFAULT_CACHE_TTL})')
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument('--refresh', action='store_true', help='Ignore cached responses and download fresh stats')
+    cache_mode.add_argument('--offline', action='store_true', help='Only use cached responses, never contact the API')
+    parser.add_argument('--stream', action='store_true', help='Decode API responses incrementally, filtering records as they are read')
+    parser.add_argument('--output', choices=OUTPUT_FORMATS, help='Output format (default: table on a terminal, csv otherwise)')
+    parser.add_argument('--output-file', help='Write output to this file instead of stdout (required for parquet)')
+    parser.add_argument('--watch', type=float, metavar='SECONDS', help='Keep running and refresh stats for teams currently playing every SECONDS')
+    parser.add_argument('--match-workers', type=int, default=1, help='Worker threads for batch fuzzy name matching (-1 uses all cores)')
     parser.add_argument('--input-csv', required=False, help='Input CSV file path with player names')
     parser.add_argument('--input-google-sheet-id', required=False, help='Input google sheet id with player names')
     parser.add_argument('--input-google-sheet-range', required=False, help='Input google sheet range with player names')
     parser.add_argument('--input-google-sheet-auth-path', required=False, help='Input google sheet oauth client secret path')
+    parser.add_argument('--input-google-sheet-local-dir', required=False, help='Read the google sheet from local CSV exports in this directory instead (offline testing)')
     return parser.parse_args()
 
 
@@ -86,37 +144,143 @@ def extract_full_names_from_csv(csv_path):
     return names
 
 
-def get_sheet_values(sheet_id, range_name, client_secret_path, token_path='token.json'):
+class GoogleSheetBackend:
+    """
+    Reads ranges from private Google Sheets using OAuth2 user credentials (Installed App flow).
+    Credentials are persisted in token_path between runs, and the authorized client is created
+    once per process and reused for every call.
+    """
+
+    def __init__(self, client_secret_path, token_path='token.json'):
+        """
+        Args:
+            client_secret_path (str): Path to the OAuth2 client_secret.json file.
+            token_path (str): Path to store the user's access/refresh token.
+        """
+        self.client_secret_path = client_secret_path
+        self.token_path = token_path
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import gspread
+            from oauth2client import tools
+            from oauth2client.file import Storage
+            from oauth2client.client import flow_from_clientsecrets
+            scope = [
+                'https://www.googleapis.com/auth/spreadsheets',
+                'https://www.googleapis.com/auth/drive'
+            ]
+            store = Storage(self.token_path)
+            creds = store.get()
+            if not creds or creds.invalid:
+                flow = flow_from_clientsecrets(self.client_secret_path, scope)
+                flags = argparse.Namespace(
+                    auth_host_name='localhost',
+                    noauth_local_webserver=False,
+                    auth_host_port=[8080, 8090],
+                    logging_level='ERROR'
+                )
+                creds = tools.run_flow(flow, store, flags=flags)
+            self._client = gspread.authorize(creds)
+        return self._client
+
+    def revision(self, sheet_id):
+        """Return the sheet's Drive modifiedTime, which changes whenever any cell is edited."""
+        return self._get_client().get_file_drive_metadata(sheet_id)["modifiedTime"]
+
+    def get_values(self, sheet_id, range_name):
+        """Fetch only the cells in the A1 range (e.g., 'Sheet1!A1:E100') with a single values.get call."""
+        return self._get_client().http_client.values_get(sheet_id, range_name).get("values", [])
+
+
+class LocalSheetBackend:
+    """
+    Offline stand-in for GoogleSheetBackend that reads CSV exports from disk.
+    A sheet is a directory named after its id containing one "<worksheet name>.csv" file per worksheet.
+    """
+
+    def __init__(self, root_dir):
+        """
+        Args:
+            root_dir (str): Directory holding one sub-directory per sheet id.
+        """
+        self.root_dir = root_dir
+
+    def revision(self, sheet_id):
+        """Return the newest modification time of the sheet's worksheet files."""
+        sheet_dir = os.path.join(self.root_dir, sheet_id)
+        return str(max(os.path.getmtime(os.path.join(sheet_dir, name)) for name in os.listdir(sheet_dir)))
+
+    def get_values(self, sheet_id, range_name):
+        """Read the cells in the A1 range (e.g., 'Sheet1!A1:E100') from the worksheet's CSV file."""
+        worksheet, _, cells = range_name.partition('!')
+        with open(os.path.join(self.root_dir, sheet_id, f"{worksheet}.csv"), newline='') as csvfile:
+            rows = list(csv.reader(csvfile))
+        if not cells:
+            return rows
+        start, _, end = cells.partition(':')
+        first_row, first_col = parse_a1_cell(start)
+        last_row, last_col = parse_a1_cell(end or start)
+        # A1 references are one-based and inclusive, so only the start bounds shift for slicing
+        first_row = first_row - 1 if first_row else None
+        first_col = first_col - 1 if first_col else None
+        return [row[first_col:last_col] for row in rows[first_row:last_row]]
+
+
+def parse_a1_cell(cell):
     """
-    Fetches values from a private Google Sheet using OAuth2 user credentials (Installed App flow).
+    Convert an A1 cell reference (e.g., 'B12', 'Z', '3') into one-based (row, column) numbers.
+    Missing parts are returned as None so they act as open slice bounds.
+    """
+    letters = "".join(ch for ch in cell if ch.isalpha()).upper()
+    digits = "".join(ch for ch in cell if ch.isdigit())
+    column = None
+    if letters:
+        column = 0
+        for ch in letters:
+            column = column * 26 + (ord(ch) - ord('A') + 1)
+    row = int(digits) if digits else None
+    return row, column
+
+
+def get_sheet_values(sheet_id, range_name, client_secret_path=None, token_path='token.json', backend=None):
+    """
+    Fetches values in the given range from a Google Sheet.
     Args:
         sheet_id (str): The Google Sheet ID.
         range_name (str): The A1 notation range (e.g., 'Sheet1!A1:E100').
         client_secret_path (str): Path to the OAuth2 client_secret.json file.
         token_path (str): Path to store the user's access/refresh token.
+        backend (GoogleSheetBackend | LocalSheetBackend): Optional backend to read from instead of creating one.
     Returns:
         list: List of rows (each row is a list of cell values as strings).
     """
-    import os
-    scope = [
-        'https://www.googleapis.com/auth/spreadsheets',
-        'https://www.googleapis.com/auth/drive'
-    ]
-    store = Storage(token_path)
-    creds = store.get()
-    if not creds or creds.invalid:
-        flow = flow_from_clientsecrets(client_secret_path, scope)
-        flags = argparse.Namespace(
-            auth_host_name='localhost',
-            noauth_local_webserver=False,
-            auth_host_port=[8080, 8090],
-            logging_level='ERROR'
-        )
-        creds = tools.run_flow(flow, store, flags=flags)
-    client = gspread.authorize(creds)
-    sheet = client.open_by_key(sheet_id)
-    worksheet = sheet.worksheet(range_name.split('!')[0])
-    return worksheet.get_all_values()
+    backend = backend or GoogleSheetBackend(client_secret_path, token_path)
+    return backend.get_values(sheet_id, range_name)
+
+
+def load_sheet_roster(sheet_id, range_name, backend, cache=None):
+    """
+    Return the player names listed in a sheet range, reusing the parsed roster cached for the
+    sheet's current revision so an unchanged sheet costs one metadata lookup instead of a range download.
+    Args:
+        sheet_id (str): The Google Sheet ID.
+        range_name (str): The A1 notation range (e.g., 'Sheet1!A1:E100').
+        backend (GoogleSheetBackend | LocalSheetBackend): Backend to read the sheet from.
+        cache (ResponseCache): Optional cache holding parsed rosters.
+    Returns:
+        list: Full player names found in the range.
+    """
+    revision = backend.revision(sheet_id)
+    if cache is not None:
+        names = cache.get_roster(sheet_id, range_name, revision)
+        if names is not None:
+            return names
+    names = extract_full_names_from_sheets(get_sheet_values(sheet_id, range_name, backend=backend))
+    if cache is not None:
+        cache.put_roster(sheet_id, range_name, revision, names)
+    return names
 
 
 def extract_full_names_from_sheets(rows):
@@ -126,7 +290,6 @@ def extract_full_names_from_sheets(rows):
     """
     full_names = []
     for row in rows:
-        print(row)
         i = 0
         while i < len(row) - 2:
             pos, first, last = row[i], row[i+1], row[i+2]
@@ -138,125 +301,705 @@ def extract_full_names_from_sheets(rows):
     return full_names
 
 
-# Fuzzy match helper for player names
-def is_fuzzy_match(name, name_list, threshold=70):
+class PlayerNameIndex:
+    """
+    Reusable fuzzy-match index over a roster of player names.
+    The roster is normalized once up front, lookups are memoized per name, and
+    batches of names are scored in a single rapidfuzz.process.cdist call.
     """
-    Fuzzy match a name against a list of names using rapidfuzz.
+
+    def __init__(self, names, threshold=70, workers=1):
+        """
+        Args:
+            names (iterable): Roster of player names to match against.
+            threshold (int): Minimum match score (0-100) to consider a match.
+            workers (int): Worker threads used by cdist (-1 uses all cores).
+        """
+        self.threshold = threshold
+        self.workers = workers
+        self.choices = sorted({self.normalize(name) for name in names if name})
+        self._memo = {}
+
+    @staticmethod
+    def normalize(name):
+        """Lowercase, strip punctuation and collapse whitespace so the roster and API names compare equally."""
+        import rapidfuzz
+        return rapidfuzz.utils.default_process(name)
+
+    def __len__(self):
+        return len(self.choices)
+
+    def match_many(self, names):
+        """
+        Match a batch of names against the roster, scoring only names not seen before.
+        Args:
+            names (iterable): Player names to look up.
+        Returns:
+            set: The subset of names that fuzzy match a roster entry.
+        """
+        import rapidfuzz
+        pending = list({name for name in names if name not in self._memo})
+        if pending:
+            if self.choices:
+                scores = rapidfuzz.process.cdist(
+                    [self.normalize(name) for name in pending],
+                    self.choices,
+                    scorer=rapidfuzz.fuzz.WRatio,
+                    workers=self.workers
+                )
+                best = scores.max(axis=1)
+            else:
+                best = [0] * len(pending)
+            for name, score in zip(pending, best):
+                self._memo[name] = bool(score >= self.threshold)
+        return {name for name in names if self._memo[name]}
+
+    def is_match(self, name):
+        """
+        Fuzzy match a single name against the roster.
+        Returns:
+            bool: True if a fuzzy match above threshold is found, else False.
+        """
+        return name in self.match_many([name])
+
+
+def records_to_frame(records):
+    """
+    Load raw API stat records into a long-format DataFrame (one row per player stat).
+    Args:
+        records (list): Stat records as returned by the API.
+    Returns:
+        pandas.DataFrame: Columns from STAT_RECORD_COLUMNS with categorical dtypes for repeated labels.
+    """
+    import pandas
+    frame = pandas.DataFrame.from_records(records, columns=STAT_RECORD_COLUMNS)
+    # Group stats by category (e.g., passing, rushing, receiving)
+    frame["category"] = frame["category"].fillna("general")
+    frame["position"] = frame["position"].str.upper()
+    return categorize_stat_frame(frame)
+
+
+def categorize_stat_frame(frame):
+    """
+    Convert the low-cardinality label columns of a long-format stats frame to categoricals.
     Args:
-        name (str): The name to match.
-        name_list (iterable): List or set of names to match against.
-        threshold (int): Minimum match score (0-100) to consider a match.
+        frame (pandas.DataFrame): Long-format stats frame.
     Returns:
-        bool: True if a fuzzy match above threshold is found, else False.
+        pandas.DataFrame: The same frame with categorical label columns.
     """
-    # Convert name_list to list for rapidfuzz
-    match, score, _ = rapidfuzz.process.extractOne(name.lower(), list(name_list))
-    return score >= threshold
+    return frame.astype({column: "category" for column in CATEGORICAL_STAT_COLUMNS})
 
 
-def create_player_dict():
+def pivot_stats(frame):
     """
-    Create a default player dictionary structure.
+    Pivot a long-format stats frame into one row per player and one column per "category_statType".
+    Done once per run; comparison tables are then sliced from the result by position.
+    Args:
+        frame (pandas.DataFrame): Long-format stats frame.
     Returns:
-        dict: Player dictionary with default fields and nested stats dict.
+        pandas.DataFrame: Wide frame indexed by (position, playerId, player, team, season), with players in the
+        order they first appear in the long frame (i.e. --teams order, then API order).
     """
-    return {
-        "season": None,
-        "playerId": None,
-        "player": None,
-        "position": None,
-        "team": None,
-        "conference": None,
-        "stats": collections.defaultdict(dict)
-    }
+    import pandas
+    index_columns = ["position", "playerId", "player", "team", "season"]
+    frame = frame.assign(column=frame["category"].astype(str) + "_" + frame["statType"].astype(str))
+    # Keep stat columns in the order they first appear in the API response
+    column_order = pandas.unique(frame["column"])
+    wide = frame.pivot_table(
+        index=index_columns,
+        columns="column",
+        values="stat",
+        aggfunc="last",
+        observed=True
+    )
+    # pivot_table sorts its index (and drops rows with a missing key), so put players back in the order of their first row
+    row_order = pandas.MultiIndex.from_frame(frame[index_columns].dropna().drop_duplicates())
+    return wide.reindex(index=row_order, columns=column_order)
 
 
-def get_team_stats(team_name, available_players=None):
+def create_session(concurrency=DEFAULT_CONCURRENCY):
     """
-    Fetch player stats for a given team from the API.
+    Create a pooled HTTP session shared by all team requests.
+    Args:
+        concurrency (int): Number of connections to keep alive in the pool.
+    Returns:
+        requests.Session: Session with auth headers and a connection pool sized for the worker count.
+    """
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class TeamFetchError(Exception):
+    """Raised when the stats for a single team could not be downloaded."""
+
+
+class ResponseCache:
+    """
+    Persistent SQLite store of API responses keyed by (year, team).
+    Bodies are stored as zlib-compressed JSON alongside the ETag/Last-Modified validators
+    so expired entries can be revalidated instead of downloaded again.
+    Parsed Google Sheet rosters are kept in the same database, keyed by (sheet id, range, revision).
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_CACHE_TTL):
+        """
+        Args:
+            cache_dir (str): Directory holding the cache database (created if missing).
+            ttl (int): Seconds an entry is considered fresh.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "responses.sqlite3")
+        self.ttl = ttl
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " year INTEGER NOT NULL,"
+                " team TEXT NOT NULL,"
+                " body BLOB NOT NULL,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " fetched_at REAL NOT NULL,"
+                " PRIMARY KEY (year, team))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rosters ("
+                " sheet_id TEXT NOT NULL,"
+                " range TEXT NOT NULL,"
+                " revision TEXT NOT NULL,"
+                " names TEXT NOT NULL,"
+                " PRIMARY KEY (sheet_id, range))"
+            )
+
+    def _connect(self):
+        # A short-lived connection per call keeps the cache safe to share across worker threads
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, year, team):
+        """
+        Look up a cached response.
+        Returns:
+            dict: {"body", "etag", "last_modified", "fresh"} or None if the team is not cached.
+                  "body" is the zlib-compressed JSON payload; see decode() and iter_body().
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE year = ? AND team = ?",
+                (year, team.lower())
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, fetched_at = row
+        return {
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": time.time() - fetched_at < self.ttl
+        }
+
+    @staticmethod
+    def decode(body):
+        """Decompress and parse a cached body into the list of API records."""
+        return json.loads(zlib.decompress(body))
+
+    @staticmethod
+    def iter_body(body, chunk_size=STREAM_CHUNK_SIZE):
+        """Yield the decompressed JSON bytes of a cached body in chunks, without inflating it all at once."""
+        decompressor = zlib.decompressobj()
+        for i in range(0, len(body), chunk_size):
+            chunk = decompressor.decompress(body[i:i + chunk_size])
+            if chunk:
+                yield chunk
+        yield decompressor.flush()
+
+    def put(self, year, team, data, etag=None, last_modified=None):
+        """Store (or replace) the response records and validators for a team."""
+        body = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        self.put_body(year, team, body, etag, last_modified)
+
+    def put_body(self, year, team, body, etag=None, last_modified=None):
+        """Store (or replace) an already compressed response body and validators for a team."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (year, team, body, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (year, team.lower(), body, etag, last_modified, time.time())
+            )
+
+    def get_roster(self, sheet_id, range_name, revision):
+        """Return the cached roster for a sheet range, or None if it is missing or from another revision."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT names FROM rosters WHERE sheet_id = ? AND range = ? AND revision = ?",
+                (sheet_id, range_name, revision)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def put_roster(self, sheet_id, range_name, revision, names):
+        """Store (or replace) the parsed roster for a sheet range at the given revision."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO rosters (sheet_id, range, revision, names) VALUES (?, ?, ?, ?)",
+                (sheet_id, range_name, revision, json.dumps(names))
+            )
+
+    def touch(self, year, team):
+        """Mark a cached entry as fresh again after a successful revalidation (HTTP 304)."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE responses SET fetched_at = ? WHERE year = ? AND team = ?",
+                (time.time(), year, team.lower())
+            )
+
+
+class ChunkReader:
+    """Minimal read-only file object over an iterator of byte chunks, as consumed by ijson."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def cache_streamed_body(chunks, cache, year, team, etag=None, last_modified=None):
+    """
+    Pass response chunks through unchanged while compressing them into the cache.
+    The entry is only written once the whole body has been read.
+    """
+    compressor = zlib.compressobj()
+    parts = []
+    for chunk in chunks:
+        parts.append(compressor.compress(chunk))
+        yield chunk
+    parts.append(compressor.flush())
+    cache.put_body(year, team, b"".join(parts), etag, last_modified)
+
+
+def fetch_team_payload(team_name, year=CURRENT_SEASON, session=None, cache=None, refresh=False, offline=False, stream=False, only_if_modified=False):
+    """
+    Return the raw API records for a team, going through the on-disk cache when one is provided.
+    Completed seasons are immutable, so a cached copy of one is always used as-is.
     Args:
         team_name (str): Team name (URL-encoded).
+        year (int): Season to fetch.
+        session (requests.Session): Optional shared session; a plain request is made if not provided.
+        cache (ResponseCache): Optional response cache.
+        refresh (bool): Skip cached entries and always download.
+        offline (bool): Only serve from the cache, never contact the API.
+        stream (bool): Return a file object over the undecoded JSON body instead of the parsed records.
+        only_if_modified (bool): Always revalidate with the API, and return None if the cached copy is still current.
     Returns:
-        list: List of player dictionaries with stats.
+        list | ChunkReader: Stat records as returned by the API, or a reader over the raw body when streaming.
+    Raises:
+        TeamFetchError: If the request fails or returns invalid JSON, or the team is not cached in offline mode.
     """
+    def from_cache(entry):
+        if only_if_modified:
+            return None
+        return ChunkReader(ResponseCache.iter_body(entry["body"])) if stream else ResponseCache.decode(entry["body"])
+
+    entry = cache.get(year, team_name) if cache is not None and not refresh else None
+    if offline:
+        if entry is None:
+            raise TeamFetchError(f"No cached stats for team '{team_name}' (year {year}) and --offline was given")
+        return from_cache(entry)
+    if entry is not None and not only_if_modified and (entry["fresh"] or year < CURRENT_SEASON):
+        return from_cache(entry)
+
+    # Revalidate stale entries so an unchanged season costs a 304 instead of a full payload
+    request_headers = dict(headers)
+    if entry is not None:
+        if entry["etag"]:
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    http = session if session is not None else requests
     try:
-        resp = requests.get(f"{base_url}{team_name}", headers=headers, timeout=10)
+        resp = http.get(f"{base_url.format(year=year)}{team_name}", headers=request_headers, timeout=10, stream=stream)
+        if resp.status_code == 304 and entry is not None:
+            cache.touch(year, team_name)
+            return from_cache(entry)
         resp.raise_for_status()
     except requests.exceptions.HTTPError as http_err:
-        print(f"HTTP error occurred for team '{team_name}': {http_err} - {resp.text}")
-        sys.exit(1)
+        raise TeamFetchError(f"HTTP error occurred for team '{team_name}': {http_err} - {resp.text}") from http_err
     except requests.exceptions.RequestException as err:
-        print(f"Network error occurred for team '{team_name}': {err}")
-        sys.exit(1)
+        raise TeamFetchError(f"Network error occurred for team '{team_name}': {err}") from err
+
+    if stream:
+        chunks = resp.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        if cache is not None:
+            chunks = cache_streamed_body(chunks, cache, year, team_name, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return ChunkReader(chunks)
 
     # Parse the JSON response from the API
-    data = resp.json()
-    # Create a defaultdict to store player data, keyed by playerId
-    players = collections.defaultdict(create_player_dict)
+    try:
+        data = resp.json()
+    except ValueError as err:
+        raise TeamFetchError(f"Invalid JSON received for team '{team_name}': {err}") from err
+    if cache is not None:
+        cache.put(year, team_name, data, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+    return data
 
-    # Iterate over each stat record in the API response
-    for record in data:
+
+def iter_filtered_records(payload, positions=None, available_players=None):
+    """
+    Decode stat records one at a time from a JSON body, yielding only the ones that will be displayed.
+    Args:
+        payload (ChunkReader): File object over the raw JSON array returned by the API.
+        positions (set): Optional upper-case positions to keep.
+        available_players (PlayerNameIndex): Optional roster to keep (names are matched once and memoized).
+    Yields:
+        dict: Stat records for matching players.
+    """
+    import ijson
+    skipped = set()
+    for record in ijson.items(payload, "item", use_float=True):
+        if positions is not None and (record.get("position") or "").upper() not in positions:
+            continue
         player_name = record["player"]
-        print(player_name)
-        # Only add player if not filtering, or if player is in available_players (case-insensitive, fuzzy)
-        if available_players is not None and not is_fuzzy_match(player_name, available_players):
-            print(f"Skipping player not in list (fuzzy): {player_name}")
+        if available_players is not None and not available_players.is_match(player_name):
+            if player_name not in skipped:
+                skipped.add(player_name)
+                print(f"Skipping player not in list (fuzzy): {player_name}", file=sys.stderr)
             continue
-        pid = record["playerId"]  # Unique player ID
-        player = players[pid]  # Get or create the player entry
-        # Populate player fields
-        player["season"] = record["season"]
-        player["playerId"] = record["playerId"]
-        player["player"] = record["player"]
-        player["position"] = record["position"]
-        player["team"] = record["team"]
-        player["conference"] = record["conference"]
+        yield record
+
+
+def get_team_stats(team_name, available_players=None, session=None, cache=None, refresh=False, offline=False, year=CURRENT_SEASON, stream=False, positions=None, only_if_modified=False):
+    """
+    Fetch player stats for a given team from the API (or the response cache).
+    Args:
+        team_name (str): Team name (URL-encoded).
+        available_players (PlayerNameIndex | iterable): Optional roster of player names to filter on.
+        session (requests.Session): Optional shared session; a plain request is made if not provided.
+        cache (ResponseCache): Optional response cache.
+        refresh (bool): Skip cached entries and always download.
+        offline (bool): Only serve from the cache, never contact the API.
+        year (int): Season to fetch.
+        stream (bool): Decode the response incrementally, dropping unwanted records as they are read.
+        positions (set): Optional upper-case positions to keep when streaming.
+        only_if_modified (bool): Always revalidate with the API, and return None if the cached copy is still current.
+    Returns:
+        pandas.DataFrame: Long-format stats frame for the team's players (None if unchanged with only_if_modified).
+    Raises:
+        TeamFetchError: If the request fails or the API returns an error status.
+    """
+    if available_players is not None and not isinstance(available_players, PlayerNameIndex):
+        available_players = PlayerNameIndex(available_players)
+
+    if stream:
+        import ijson
+        payload = fetch_team_payload(team_name, year=year, session=session, cache=cache, refresh=refresh, offline=offline, stream=True, only_if_modified=only_if_modified)
+        if payload is None:
+            return None
+        try:
+            return records_to_frame(list(iter_filtered_records(payload, positions, available_players)))
+        except requests.exceptions.RequestException as err:
+            raise TeamFetchError(f"Network error occurred for team '{team_name}': {err}") from err
+        except ijson.JSONError as err:
+            raise TeamFetchError(f"Invalid JSON received for team '{team_name}': {err}") from err
+
+    data = fetch_team_payload(team_name, year=year, session=session, cache=cache, refresh=refresh, offline=offline, only_if_modified=only_if_modified)
+    if data is None:
+        return None
+
+    # Only keep players if not filtering, or if player is in available_players (case-insensitive, fuzzy).
+    # All unique names in the payload are matched in one batch rather than once per stat record.
+    if available_players is not None:
+        names = {record["player"] for record in data}
+        matched = available_players.match_many(names)
+        for player_name in sorted(names - matched):
+            print(f"Skipping player not in list (fuzzy): {player_name}", file=sys.stderr)
+        data = [record for record in data if record["player"] in matched]
+
+    return records_to_frame(data)
+
+
+def fetch_team_frames(pairs, session, concurrency=DEFAULT_CONCURRENCY, **options):
+    """
+    Fetch player stats for (team, season) pairs concurrently using a bounded thread pool and a shared session.
+    Args:
+        pairs (list): (team name, year) tuples to fetch.
+        session (requests.Session): Shared session used by every worker.
+        concurrency (int): Max number of teams fetched at once.
+        options: Keyword arguments passed through to get_team_stats().
+    Returns:
+        tuple: (dict of (team, year) -> long-format stats frame, dict of "team (year)" -> error message for failed fetches)
+    """
+    results = {}
+    errors = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(get_team_stats, format_team_name(team), session=session, year=year, **options): (team, year)
+            for team, year in pairs
+        }
+        for future in concurrent.futures.as_completed(futures):
+            team, year = futures[future]
+            try:
+                results[(team, year)] = future.result()
+            except TeamFetchError as err:
+                errors[f"{team} ({year})"] = str(err)
+    return results, errors
+
+
+def combine_team_frames(results, team_list, years):
+    """
+    Concatenate per-team stats frames into one long-format frame, in team/season order.
+    Args:
+        results (dict): (team, year) -> long-format stats frame.
+        team_list (list): Team names as provided on the command line.
+        years (iterable): Seasons fetched for every team.
+    Returns:
+        pandas.DataFrame: Combined long-format stats frame.
+    """
+    import pandas
+    # Keep output ordering stable regardless of which team finished first
+    frames = [results[(team, year)] for team in team_list for year in years if results.get((team, year)) is not None]
+    if not frames:
+        return records_to_frame([])
+    return categorize_stat_frame(pandas.concat(frames, ignore_index=True))
 
-        # Group stats by category (e.g., passing, rushing, receiving)
-        category = record.get("category", "general")
-        # Store the stat value under the appropriate category and stat type
-        player["stats"][category][record["statType"]] = record["stat"]
 
-    # Return a list of all player dictionaries
-    return list(players.values())
+def fetch_all_team_stats(team_list, available_players=None, concurrency=DEFAULT_CONCURRENCY, cache=None, refresh=False, offline=False, years=(CURRENT_SEASON,), stream=False, positions=None):
+    """
+    Fetch player stats for every (team, season) pair concurrently using a bounded thread pool and a shared session.
+    Args:
+        team_list (list): Team names as provided on the command line.
+        available_players (PlayerNameIndex | iterable): Optional roster of player names to filter on.
+        concurrency (int): Max number of teams fetched at once.
+        cache (ResponseCache): Optional response cache shared by all workers.
+        refresh (bool): Skip cached entries and always download.
+        offline (bool): Only serve from the cache, never contact the API.
+        years (iterable): Seasons to fetch for every team.
+        stream (bool): Decode responses incrementally, dropping unwanted records as they are read.
+        positions (set): Optional upper-case positions to keep when streaming.
+    Returns:
+        tuple: (long-format stats frame in team/season order, dict of "team (year)" -> error message for failed fetches)
+    """
+    pairs = [(team, year) for team in team_list for year in years]
+    with create_session(concurrency) as session:
+        results, errors = fetch_team_frames(
+            pairs,
+            session,
+            concurrency,
+            available_players=available_players,
+            cache=cache,
+            refresh=refresh,
+            offline=offline,
+            stream=stream,
+            positions=positions
+        )
+    return combine_team_frames(results, team_list, years), errors
 
 
-def build_comparison_table(players_list, position, available_players=None):
+def get_teams_playing(session, team_list):
+    """
+    Return the teams from team_list that currently have a game in progress, according to the API scoreboard.
+    If the scoreboard cannot be read, every team is returned so nothing is missed.
+    Args:
+        session (requests.Session): Shared session.
+        team_list (list): Team names as provided on the command line.
+    Returns:
+        list: Team names with a live game.
+    """
+    try:
+        resp = session.get(scoreboard_url, timeout=10)
+        resp.raise_for_status()
+        games = resp.json()
+    except (requests.exceptions.RequestException, ValueError) as err:
+        print(f"Warning: could not read scoreboard, polling all teams: {err}", file=sys.stderr)
+        return list(team_list)
+    live = set()
+    for game in games:
+        if game.get("status") == "in_progress":
+            for side in ("homeTeam", "awayTeam"):
+                name = (game.get(side) or {}).get("name")
+                if name:
+                    live.add(name.lower())
+    return [team for team in team_list if team.lower() in live]
+
+
+def changed_positions(old_frame, new_frame):
+    """
+    Compare two long-format stats frames for the same team and return the positions whose stats differ.
+    Args:
+        old_frame (pandas.DataFrame): Previous stats frame (or None).
+        new_frame (pandas.DataFrame): Freshly fetched stats frame.
+    Returns:
+        set: Upper-case positions with added, removed or changed stat records.
+    """
+    columns = ["position", "playerId", "category", "statType", "stat"]
+
+    def stat_rows(frame):
+        if frame is None:
+            return set()
+        return set(frame[columns].astype(str).itertuples(index=False, name=None))
+
+    return {row[0] for row in stat_rows(old_frame) ^ stat_rows(new_frame)}
+
+
+def watch_team_stats(team_list, years, interval, render, concurrency=DEFAULT_CONCURRENCY, **options):
+    """
+    Render stats once, then poll teams that are currently playing every interval seconds and
+    re-render only the positions whose stats changed. Runs until interrupted with control+c.
+    Args:
+        team_list (list): Team names as provided on the command line.
+        years (list): Seasons to display; only the current season is polled.
+        interval (float): Seconds between polls.
+        render (callable): Called with (pivoted stats frame, set of upper-case positions to render).
+        concurrency (int): Max number of teams fetched at once.
+        options: Keyword arguments passed through to get_team_stats().
+    Returns:
+        None
+    """
+    with create_session(concurrency) as session:
+        results, errors = fetch_team_frames([(team, year) for team in team_list for year in years], session, concurrency, **options)
+        for message in errors.values():
+            print(f"Error: {message}", file=sys.stderr)
+        render(pivot_stats(combine_team_frames(results, team_list, years)), None)
+
+        next_tick = time.monotonic()
+        while True:
+            try:
+                # schedule against the monotonic clock so slow polls don't push later ticks back
+                next_tick += interval
+                time.sleep(max(0.0, next_tick - time.monotonic()))
+                if CURRENT_SEASON not in years:
+                    continue
+                playing = get_teams_playing(session, team_list)
+                updates, errors = fetch_team_frames(
+                    [(team, CURRENT_SEASON) for team in playing], session, concurrency, only_if_modified=True, **options
+                )
+                for message in errors.values():
+                    print(f"Error: {message}", file=sys.stderr)
+
+                changed = set()
+                for key, frame in updates.items():
+                    if frame is None:  # not modified since the last poll
+                        continue
+                    changed |= changed_positions(results.get(key), frame)
+                    results[key] = frame
+                if changed:
+                    print(f"\nUpdated: {time.strftime('%H:%M:%S')}", file=sys.stderr)
+                    render(pivot_stats(combine_team_frames(results, team_list, years)), changed)
+            except KeyboardInterrupt:
+                break
+
+
+def select_positions(player_stats, positions):
+    """
+    Slice the wide stats frame down to the given positions.
+    Args:
+        player_stats (pandas.DataFrame): Wide stats frame from pivot_stats().
+        positions (list): Positions to keep; "all" keeps every player.
+    Returns:
+        pandas.DataFrame: Matching rows, with stat columns no remaining player has dropped.
+    """
+    if "all" not in [pos.lower() for pos in positions]:
+        keep = [pos.upper() for pos in positions]
+        player_stats = player_stats[player_stats.index.get_level_values("position").isin(keep)]
+    return player_stats.dropna(axis=1, how="all")
+
+
+def iter_player_records(rows):
+    """
+    Yield one dictionary per player from a slice of the wide stats frame, omitting stats the player does not have.
+    Args:
+        rows (pandas.DataFrame): Wide stats rows, e.g. from select_positions().
+    Yields:
+        dict: Player identity fields followed by "category_statType" stat values.
+    """
+    import pandas
+    flat = rows.reset_index()
+    columns = list(flat.columns)
+    for values in flat.itertuples(index=False, name=None):
+        yield {column: value for column, value in zip(columns, values) if not pandas.isna(value)}
+
+
+def write_stats(player_stats, positions, output_format, output_file=None):
+    """
+    Write player stats in a machine-readable format, one player per row, without building the display table.
+    Args:
+        player_stats (pandas.DataFrame): Wide stats frame from pivot_stats().
+        positions (list): Positions to include; "all" includes every player.
+        output_format (str): One of csv, json, ndjson or parquet.
+        output_file (str): Destination path; stdout is used if not provided (not supported for parquet).
+    Returns:
+        None
+    """
+    import pandas
+    rows = select_positions(player_stats, positions)
+    if output_format == "parquet":
+        flat = rows.reset_index()
+        flat[["position", "player", "team"]] = flat[["position", "player", "team"]].astype(str)
+        flat.to_parquet(output_file, index=False)
+        return
+
+    out = open(output_file, "w", newline="") if output_file else sys.stdout
+    try:
+        if output_format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(list(rows.index.names) + list(rows.columns))
+            for index, values in zip(rows.index, rows.itertuples(index=False, name=None)):
+                writer.writerow(list(index) + ["" if pandas.isna(value) else value for value in values])
+        elif output_format == "ndjson":
+            for record in iter_player_records(rows):
+                out.write(json.dumps(record, default=str) + "\n")
+        elif output_format == "json":
+            out.write("[")
+            for i, record in enumerate(iter_player_records(rows)):
+                out.write(("," if i else "") + "\n  " + json.dumps(record, default=str))
+            out.write("\n]\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def build_comparison_table(player_stats, position, available_players=None):
     """
     Build and print a comparison table of player stats for a given position.
     Args:
-        players_list (list): List of player dictionaries.
+        player_stats (pandas.DataFrame): Wide stats frame from pivot_stats().
         position (str): Player position to filter and display.
     Returns:
         None
     """
-    rows = []
-    pos_key = position.upper() if position.lower() != 'all' else None
-
-    for player in players_list:
-        player_pos = player["position"].upper()
-        # Only filter by position now
-        if position.lower() == "all" or player_pos == pos_key:
-            flat_stats = {
-                "Player": f"{player['player']}",
-                "Team": f"{player['team']}"
-            }
-            for category, stats in player["stats"].items():
-                for stat_name, stat_val in stats.items():
-                    col_name = f"{category}_{stat_name}"
-                    flat_stats[col_name] = stat_val
-            rows.append(flat_stats)
+    rows = select_positions(player_stats, [position])
 
     # If no players matched the position, print a message and exit the function
-    if not rows:
+    if rows.empty:
         print(f"No players found for position: {position}")
         return
 
-    # Create a DataFrame from the rows and fill missing values with empty strings
-    df = pandas.DataFrame(rows).fillna("")
+    # Fill the gaps left by stats only some players have with empty strings
+    rows = rows.fillna("")
+    players = rows.index.get_level_values("player").astype(str)
+    teams = rows.index.get_level_values("team").astype(str)
+    seasons = rows.index.get_level_values("season")
+    # Label each column with its season when comparing players across several seasons
+    if seasons.nunique() > 1:
+        players = [f"{player} ({season})" for player, season in zip(players, seasons)]
+    df = rows.reset_index(drop=True)
+    df.insert(0, "Team", teams)
+    df.index = players
     # Transpose the DataFrame so stats are rows and players are columns
-    df = df.set_index("Player").T  # transpose: stats as rows, players as columns
+    df = df.T.rename_axis(index=None, columns=None)  # transpose: stats as rows, players as columns
 
+    import tabulate
     # Print the position and the formatted table
     print(f"\nPosition: {position}\n")
     print(tabulate.tabulate(df, headers="keys", tablefmt="fancy_grid"))
@@ -287,10 +1030,23 @@ def main():
     input_google_sheet_id = args.input_google_sheet_id
     input_google_sheet_range = args.input_google_sheet_range
     input_google_sheet_client_auth_path = args.input_google_sheet_auth_path
+    if args.concurrency < 1:
+        print("Error: --concurrency must be at least 1.")
+        sys.exit(1)
+    output_format = args.output or ("table" if sys.stdout.isatty() else "csv")
+    if output_format == "parquet" and not args.output_file:
+        print("Error: --output parquet requires --output-file.")
+        sys.exit(1)
+    if args.watch is not None and (args.watch <= 0 or args.offline):
+        print("Error: --watch requires a positive interval and cannot be combined with --offline.")
+        sys.exit(1)
+    input_google_sheet_local_dir = args.input_google_sheet_local_dir
+    input_google_sheet_source = input_google_sheet_client_auth_path or input_google_sheet_local_dir
     # if google sheet args are provided, ensure all are present
-    if (input_google_sheet_id or input_google_sheet_range or input_google_sheet_client_auth_path) and not (input_google_sheet_id and input_google_sheet_range and input_google_sheet_client_auth_path):
+    if (input_google_sheet_id or input_google_sheet_range or input_google_sheet_source) and not (input_google_sheet_id and input_google_sheet_range and input_google_sheet_source):
         print("Error: If using Google Sheet input, please provide --input-google-sheet-id, --input-google-sheet-range, and --input-google-sheet-auth-path.")
-        sys.exit(1)    
+        sys.exit(1)
+    cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl)
 
     # if provided as an arg, check file and extract all available players from CSV
     if input_csv_path is not None:
@@ -300,23 +1056,66 @@ def main():
         available_players = extract_full_names_from_csv(input_csv_path)
     # if provided as an arg, check google sheet and extract all available players
     elif input_google_sheet_id is not None:
-        available_players = extract_full_names_from_sheets(get_sheet_values(input_google_sheet_id, input_google_sheet_range, input_google_sheet_client_auth_path))
+        if input_google_sheet_local_dir is not None:
+            backend = LocalSheetBackend(input_google_sheet_local_dir)
+        else:
+            backend = GoogleSheetBackend(input_google_sheet_client_auth_path)
+        available_players = load_sheet_roster(input_google_sheet_id, input_google_sheet_range, backend, cache=None if args.refresh else cache)
     else:
         available_players = None
 
-    print(available_players)
-    # Loop through each team, fetch player stats, and add them to the list
-    all_players = []
-    for team in team_list:
-        all_players.extend(get_team_stats(format_team_name(team), available_players=available_players))
-
-    # Build and print comparison tables for each position if 'all' is specified
-    ALL_POSITIONS = ["qb", "rb", "wr", "te", "pk"]
-    if position.lower() == "all":
-        for pos in ALL_POSITIONS:
-            build_comparison_table(all_players, pos, available_players=available_players)
-    else:
-        build_comparison_table(all_players, position, available_players=available_players)
+    print(available_players, file=sys.stderr)
+    # Pre-process the roster once so every team shares the same memoized fuzzy-match index
+    if available_players is not None:
+        available_players = PlayerNameIndex(available_players, workers=args.match_workers)
+    years = sorted({year for year_range in args.years for year in year_range})
+    shown_positions = ALL_POSITIONS if position.lower() == "all" else [position]
+
+    def render(player_stats, changed=None):
+        """Render the given positions (all shown positions if changed is None) in the selected output format."""
+        positions = [pos for pos in shown_positions if changed is None or pos.upper() in changed]
+        # Machine-readable formats are written in one pass, skipping tabulate entirely.
+        # An output file always holds a full snapshot; stdout only receives the changed positions.
+        if output_format != "table":
+            write_stats(player_stats, shown_positions if args.output_file else positions, output_format, args.output_file)
+            return
+        # Build and print comparison tables for each position if 'all' is specified
+        for pos in positions:
+            build_comparison_table(player_stats, pos, available_players=available_players)
+
+    if args.watch is not None:
+        watch_team_stats(
+            team_list,
+            years,
+            args.watch,
+            render,
+            concurrency=args.concurrency,
+            available_players=available_players,
+            cache=cache,
+            stream=args.stream,
+            positions={pos.upper() for pos in shown_positions}
+        )
+        return
+
+    # Fetch player stats for all teams concurrently, collecting per-team failures instead of exiting
+    all_stats, errors = fetch_all_team_stats(
+        team_list,
+        available_players=available_players,
+        concurrency=args.concurrency,
+        cache=cache,
+        refresh=args.refresh,
+        offline=args.offline,
+        years=years,
+        stream=args.stream,
+        positions={pos.upper() for pos in shown_positions}
+    )
+    for team, message in errors.items():
+        print(f"Error: {message}", file=sys.stderr)
+    if len(errors) == len(team_list) * len(years):
+        sys.exit(1)
+
+    # Pivot once for the whole run, then slice per position
+    render(pivot_stats(all_stats))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,203 @@
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import argparse
+import json
+import time
+import sys
+
+"""
+Author:         Nick Loden
+
+Last Update:    10/18/2026
+
+Description:    This script collects health check data from a fleet of hosts concurrently and aggregates it into one
+                table or json document. Every host runs metrics_exporter.py as its agent, which keeps a background
+                sampled snapshot of system_health_check.py data at /health, so collecting from a host is a single
+                small http request that never waits on the host's own sampling. Hosts are queried by a bounded pool
+                of worker threads with a timeout per host, so a sweep takes about as long as the slowest host (per
+                batch of workers) rather than the sum of all hosts, and an unreachable or hung host is reported as
+                failed instead of stalling the sweep.
+
+Input:          hosts       = host:port agent addresses (port defaults to 9110)
+                --hosts-file = optional file with one host:port per line (blank lines and # comments are ignored)
+                --workers   = optional maximum number of hosts queried at once (default: 256)
+                --timeout   = optional seconds to wait for each host (default: 3)
+                --json      = optional, output one json document instead of a table
+
+Standard Form:  python fleet_health_check.py [host[:port] ...] [--hosts-file <file>] [--workers <int>]
+                    [--timeout <seconds>] [--json]
+
+                e.g. against several local agents:
+                    python metrics_exporter.py --port 9201 &
+                    python metrics_exporter.py --port 9202 &
+                    python fleet_health_check.py localhost:9201 localhost:9202
+
+Installation/Configuration Guidance:
+
+    Option 1:
+        pip install -r requirements.txt
+
+    Option 2:
+        pip install psutil
+"""
+
+
+DEFAULT_AGENT_PORT = 9110
+READ_CHUNK_SIZE = 65536  # bytes read from an agent at a time, so the deadline is checked between reads
+
+
+def parse_host(address):
+    """returns (host, port) for a host or host:port agent address."""
+    host, _, port = address.strip().rpartition(':')
+    if not host or not port.isdigit():
+        return address.strip(), DEFAULT_AGENT_PORT
+    return host, int(port)
+
+
+def load_hosts(addresses, hosts_file=None):
+    """returns the list of (host, port) agents from the command line and an optional hosts file."""
+    if hosts_file is not None:
+        with open(hosts_file) as f:
+            addresses = list(addresses) + [line.split('#')[0] for line in f]
+    return [parse_host(address) for address in addresses if address.strip()]
+
+
+def time_left(deadline):
+    """returns the seconds left before deadline, raising TimeoutError once it has passed."""
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise TimeoutError('timed out')
+    return left
+
+
+def fetch_health(host, port, timeout=3):
+    """
+    fetch_health collects the /health document from one agent.
+    :param timeout: seconds allowed for the whole request, from connecting to reading the last byte.
+    :return: dictionary with host, port, ok, latency (seconds) and either the agent's facts and sample or an error.
+    """
+    result = {'host': host, 'port': port, 'ok': False}
+    start = time.monotonic()
+    deadline = start + timeout
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        connection.request('GET', '/health')
+        sock = connection.sock
+        # the socket timeout applies to each read, so shrink it to the time left before every read
+        sock.settimeout(time_left(deadline))
+        response = connection.getresponse()
+        # the body is read in bounded chunks, checking the deadline before each one, so an agent that trickles its
+        # reply cannot hold the worker past the timeout
+        chunks = []
+        while True:
+            sock.settimeout(time_left(deadline))
+            chunk = response.read1(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        body = b''.join(chunks)
+        if response.status != 200:
+            result['error'] = 'http {}'.format(response.status)
+        else:
+            payload = json.loads(body)
+            if isinstance(payload, dict) and isinstance(payload.get('sample'), dict):
+                result.update(payload)
+                result['ok'] = True
+            else:
+                result['error'] = 'not a health document'
+    except (OSError, http.client.HTTPException, ValueError) as err:
+        result['error'] = 'timed out' if isinstance(err, TimeoutError) else str(err) or type(err).__name__
+    finally:
+        connection.close()
+    result['latency'] = time.monotonic() - start
+    return result
+
+
+def sweep(hosts, workers=256, timeout=3):
+    """
+    sweep collects the health of every host concurrently.
+    :param hosts: list of (host, port) agents.
+    :param workers: maximum number of hosts queried at once.
+    :param timeout: seconds to wait for each host.
+    :return: list of fetch_health results, in the same order as hosts.
+    """
+    if not hosts:
+        return []
+    with ThreadPoolExecutor(max_workers=min(workers, len(hosts))) as executor:
+        return list(executor.map(lambda agent: fetch_health(agent[0], agent[1], timeout), hosts))
+
+
+def summarize(results):
+    """returns fleet wide totals and cpu, memory and disk averages and maximums over the hosts that answered."""
+    healthy = [result for result in results if result['ok']]
+    summary = {'hosts': len(results), 'ok': len(healthy), 'failed': len(results) - len(healthy)}
+    if healthy:
+        columns = {
+            'cpu_util': [result['sample']['cpu_util'] for result in healthy],
+            'memory_used_percent': [result['sample']['memory'][2] for result in healthy],
+            'max_disk_used_percent': [max_disk_used(result) for result in healthy],
+        }
+        for name, values in columns.items():
+            summary[name] = {'avg': sum(values) / len(values), 'max': max(values)}
+    return summary
+
+
+def max_disk_used(result):
+    """returns the used percent of the fullest disk of a host, or 0 if no disk was reported."""
+    return max((stats[2] for stats in result['sample']['disks'].values() if stats is not None), default=0.0)
+
+
+def print_table(results, summary, elapsed):
+    """output one line per host followed by the fleet summary"""
+    header = '{:<28} {:<7} {:>7} {:>7} {:>7} {:>7} {:>9} {:>9}'.format(
+        'Host', 'Status', 'CPU %', 'Load', 'Mem %', 'Swap %', 'Disk %', 'Latency')
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        address = '{}:{}'.format(result['host'], result['port'])
+        if not result['ok']:
+            print('{:<28} {:<7} {}'.format(address, 'FAILED', result['error']))
+            continue
+        sample = result['sample']
+        print('{:<28} {:<7} {:>7.1f} {:>7.2f} {:>7.1f} {:>7.1f} {:>9.1f} {:>7.0f}ms'.format(
+            address, 'OK', sample['cpu_util'], sample['load_avg'][0], sample['memory'][2], sample['swap'][2],
+            max_disk_used(result), result['latency'] * 1000))
+    print('')
+    print('{} host(s): {} ok, {} failed, swept in {:.2f} second(s)'.format(
+        summary['hosts'], summary['ok'], summary['failed'], elapsed))
+    if summary['ok']:
+        print('CPU: avg {:.1f}% max {:.1f}% | Memory: avg {:.1f}% max {:.1f}% | Fullest disk: avg {:.1f}% max {:.1f}%'.format(
+            summary['cpu_util']['avg'], summary['cpu_util']['max'], summary['memory_used_percent']['avg'],
+            summary['memory_used_percent']['max'], summary['max_disk_used_percent']['avg'],
+            summary['max_disk_used_percent']['max']))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Collect health check data from many hosts concurrently.')
+    parser.add_argument('hosts', nargs='*', help='host:port agent addresses (port defaults to {})'.format(DEFAULT_AGENT_PORT))
+    parser.add_argument('--hosts-file', help='file with one host:port per line')
+    parser.add_argument('--workers', type=int, default=256, help='maximum number of hosts queried at once (default: 256)')
+    parser.add_argument('--timeout', type=float, default=3, help='seconds to wait for each host (default: 3)')
+    parser.add_argument('--json', action='store_true', help='output one json document instead of a table')
+    args = parser.parse_args()
+    if args.workers < 1 or args.timeout <= 0:
+        parser.error('--workers and --timeout must be positive')
+
+    try:
+        hosts = load_hosts(args.hosts, args.hosts_file)
+    except OSError as err:
+        parser.error('unable to read hosts file: {}'.format(err))
+    if not hosts:
+        parser.error('no hosts given')
+
+    start = time.monotonic()
+    results = sweep(hosts, args.workers, args.timeout)
+    elapsed = time.monotonic() - start
+    summary = summarize(results)
+
+    if args.json:
+        json.dump({'elapsed': elapsed, 'summary': summary, 'hosts': results}, sys.stdout, indent=2)
+        print('')
+    else:
+        print_table(results, summary, elapsed)
+    sys.exit(0 if summary['failed'] == 0 else 1)
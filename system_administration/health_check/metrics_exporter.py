@@ -0,0 +1,268 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import system_health_check
+import utilization_alert
+import threading
+import argparse
+import json
+import psutil
+import time
+
+"""
+Author:         Nick Loden
+
+Last Update:    10/18/2026
+
+Description:    This script exposes the statistics of system_health_check.py and the checks of utilization_alert.py
+                on an http /metrics endpoint in the OpenMetrics (or classic Prometheus text) format, so Prometheus can
+                scrape them directly. A HealthSampler samples the system in a background thread and each new sample
+                is rendered once into a snapshot; a scrape only returns the latest snapshot and never waits on psutil.
+                Exposed metrics include cpu utilization, load averages, memory, swap, per mount disk usage (with the
+                age of stale results, and whether a mount ever answered), per interface network counters and the
+                pass/fail state of each utilization alert check. The same snapshot is also served as a json document
+                at /health, which is the agent endpoint fleet_health_check.py collects from.
+
+Input:          --port          = optional port to listen on (default: 9110)
+                --bind          = optional address to listen on (default: 0.0.0.0)
+                --interval      = optional seconds between samples (default: 5)
+                --disk-timeout  = optional seconds to wait for disk probes (default: 2)
+                --rules         = optional utilization_alert.py json rules file, loaded once at startup
+                                  (default: the built in rules)
+
+Standard Form:  python metrics_exporter.py [--port <port>] [--bind <address>] [--interval <seconds>]
+                    [--disk-timeout <seconds>] [--rules <file>]
+
+                curl http://localhost:9110/metrics
+                curl http://localhost:9110/health
+
+Installation/Configuration Guidance:
+
+    Option 1:
+        pip install -r requirements.txt
+
+    Option 2:
+        pip install psutil
+"""
+
+
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+JSON_CONTENT_TYPE = 'application/json'
+NETWORK_COUNTERS = ('sent_bytes', 'received_bytes', 'sent_packets', 'received_packets', 'receive_errors',
+                    'transmit_errors', 'receive_drops', 'transmit_drops')
+
+
+def escape_label(value):
+    """returns a label value escaped for the exposition format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(name, escape_label(value)) for name, value in labels.items()) + '}'
+
+
+def render_family(lines, name, metric_type, help_text, samples, openmetrics):
+    """
+    render_family appends one metric family to lines.
+    :param name: metric name. counters and info metrics are named without their _total or _info suffix, which is
+    added to every sample.
+    :param metric_type: gauge, counter or info.
+    :param samples: list of (labels dictionary, value) pairs.
+    :param openmetrics: True for the OpenMetrics format, False for the classic Prometheus text format.
+    """
+    if not samples:
+        return
+    sample_name = name + {'counter': '_total', 'info': '_info'}.get(metric_type, '')
+    # the classic format names the family after its samples, and has no info type
+    family_name = name if openmetrics else sample_name
+    if not openmetrics and metric_type == 'info':
+        metric_type = 'gauge'
+    lines.append('# HELP {} {}'.format(family_name, help_text))
+    lines.append('# TYPE {} {}'.format(family_name, metric_type))
+    for labels, value in samples:
+        lines.append('{}{} {}'.format(sample_name, format_labels(labels), repr(float(value))))
+
+
+def render_metrics(facts, sample, openmetrics=True, checks=None):
+    """
+    render_metrics renders static facts and one health sample in the exposition format.
+    :param facts: dictionary returned by system_health_check.get_static_facts.
+    :param sample: system_health_check.HealthSample.
+    :param openmetrics: True for the OpenMetrics format, False for the classic Prometheus text format.
+    :param checks: utilization_alert.check_sample results for the sample (default: the built in rules are checked).
+    :return: the response body as bytes.
+    """
+    if checks is None:
+        checks = utilization_alert.check_sample(sample)
+    lines = []
+    gb = 1000000000
+    render_family(lines, 'health_host', 'info', 'Static facts about the host.', [({
+        'hostname': facts['hostname'], 'ip_addr': facts['ip_addr'], 'os': facts['os'], 'cpu_arch': facts['cpu_arch'],
+    }, 1)], openmetrics)
+    render_family(lines, 'health_boot_time_seconds', 'gauge', 'System boot time in seconds since the epoch.',
+                  [({}, psutil.boot_time())], openmetrics)
+    render_family(lines, 'health_cpu_cores', 'gauge', 'Number of cpu cores.', [
+        ({'type': 'physical'}, facts['physical_cores'] or 0), ({'type': 'logical'}, facts['logical_cores'] or 0),
+    ], openmetrics)
+    render_family(lines, 'health_sample_timestamp_seconds', 'gauge', 'Time the exposed sample was taken.',
+                  [({}, sample.timestamp)], openmetrics)
+    render_family(lines, 'health_cpu_utilization_percent', 'gauge', 'System wide cpu utilization since the previous sample.',
+                  [({}, sample.cpu_util)], openmetrics)
+    render_family(lines, 'health_load_average', 'gauge', 'System load averages.', [
+        ({'period': period}, value) for period, value in zip(('1m', '5m', '15m'), sample.load_avg)
+    ], openmetrics)
+
+    total, available, percent = sample.memory
+    render_family(lines, 'health_memory_total_bytes', 'gauge', 'Total physical memory.', [({}, round(total * gb))], openmetrics)
+    render_family(lines, 'health_memory_available_bytes', 'gauge', 'Available physical memory.',
+                  [({}, round(available * gb))], openmetrics)
+    render_family(lines, 'health_memory_used_percent', 'gauge', 'Used physical memory.', [({}, percent)], openmetrics)
+    total, free, percent = sample.swap
+    render_family(lines, 'health_swap_total_bytes', 'gauge', 'Total swap space.', [({}, round(total * gb))], openmetrics)
+    render_family(lines, 'health_swap_free_bytes', 'gauge', 'Free swap space.', [({}, round(free * gb))], openmetrics)
+    render_family(lines, 'health_swap_used_percent', 'gauge', 'Used swap space.', [({}, percent)], openmetrics)
+
+    render_family(lines, 'health_disk_answered', 'gauge',
+                  'Whether the mount has answered a disk probe in time (0 while it never has).',
+                  [({'mountpoint': mount}, int(stats is not None)) for mount, stats in sorted(sample.disks.items())],
+                  openmetrics)
+    # mounts that never answered have no usage to expose
+    disks = sorted((mount, stats) for mount, stats in sample.disks.items() if stats is not None)
+    render_family(lines, 'health_disk_total_bytes', 'gauge', 'Total size of the mounted file system.',
+                  [({'mountpoint': mount}, round(stats[0] * gb)) for mount, stats in disks], openmetrics)
+    render_family(lines, 'health_disk_free_bytes', 'gauge', 'Free space of the mounted file system.',
+                  [({'mountpoint': mount}, round(stats[1] * gb)) for mount, stats in disks], openmetrics)
+    render_family(lines, 'health_disk_used_percent', 'gauge', 'Used space of the mounted file system.',
+                  [({'mountpoint': mount}, stats[2]) for mount, stats in disks], openmetrics)
+    render_family(lines, 'health_disk_stale_seconds', 'gauge',
+                  'Age of a disk result reported from cache because the mount did not answer in time (0 when fresh).',
+                  [({'mountpoint': mount}, stats[3] or 0) for mount, stats in disks], openmetrics)
+
+    network = sorted(sample.network.items())
+    for index, counter in enumerate(NETWORK_COUNTERS):
+        render_family(lines, 'health_network_{}'.format(counter), 'counter',
+                      'Network interface {} since boot.'.format(counter.replace('_', ' ')),
+                      [({'interface': interface}, counters[index]) for interface, counters in network], openmetrics)
+
+    render_family(lines, 'utilization_alert_check_ok', 'gauge', 'Whether a utilization alert check passed (1) or failed (0).',
+                  [({'check': check, 'target': target}, int(ok))
+                   for (check, target), ok in sorted(checks.items())],
+                  openmetrics)
+
+    if openmetrics:
+        lines.append('# EOF')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def render_health(facts, sample):
+    """
+    render_health renders static facts and one health sample as the json document served at /health.
+    :return: the response body as bytes.
+    """
+    return json.dumps({'facts': facts, 'sample': sample._asdict()}).encode('utf-8')
+
+
+class MetricsSnapshot:
+    """
+    MetricsSnapshot holds the rendered metrics of the latest sample. Every format is rendered once per sample in the
+    sampling thread, so serving a scrape is a dictionary lookup.
+    """
+
+    def __init__(self, rules=None):
+        """:param rules: utilization_alert rules checked on every sample, loaded once (default: the built in rules)."""
+        self.rules = rules
+        self._lock = threading.Lock()
+        self._bodies = None
+
+    def update(self, sample):
+        facts = system_health_check.get_static_facts()
+        # check the rules once per sample, for every format
+        checks = utilization_alert.check_sample(sample, self.rules)
+        bodies = {
+            OPENMETRICS_CONTENT_TYPE: render_metrics(facts, sample, True, checks),
+            PROMETHEUS_CONTENT_TYPE: render_metrics(facts, sample, False, checks),
+            JSON_CONTENT_TYPE: render_health(facts, sample),
+        }
+        with self._lock:
+            self._bodies = bodies
+
+    def get(self, content_type):
+        """returns the rendered body for the given content type, or None if nothing was sampled yet."""
+        with self._lock:
+            return self._bodies[content_type] if self._bodies else None
+
+
+def make_handler(snapshot):
+    """returns a request handler class that serves the given snapshot."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path == '/health':
+                content_type = JSON_CONTENT_TYPE
+            elif path == '/metrics':
+                # prometheus asks for OpenMetrics in its Accept header. other clients get the classic text format
+                if 'application/openmetrics-text' in self.headers.get('Accept', ''):
+                    content_type = OPENMETRICS_CONTENT_TYPE
+                else:
+                    content_type = PROMETHEUS_CONTENT_TYPE
+            else:
+                self.send_error(404, 'metrics are served at /metrics and /health')
+                return
+            body = snapshot.get(content_type)
+            if body is None:
+                self.send_error(503, 'no sample has been taken yet')
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # scrapes every few seconds would flood standard out
+
+    return MetricsHandler
+
+
+def serve(port=9110, bind='0.0.0.0', interval=5, disk_timeout=2.0, rules=None):
+    """sample in the background and serve /metrics and /health until control+c"""
+    snapshot = MetricsSnapshot(rules)
+    sampler = system_health_check.HealthSampler(interval, history=1, disk_timeout=disk_timeout)
+    # take the first sample right away, so the endpoint has data before the first interval passes
+    system_health_check.get_cpu_util(None)
+    time.sleep(0.1)
+    snapshot.update(sampler.sample())
+    sampler.start(callback=snapshot.update)
+
+    server = ThreadingHTTPServer((bind, port), make_handler(snapshot))
+    server.daemon_threads = True
+    print('Serving metrics on http://{0}:{1}/metrics and http://{0}:{1}/health, sampling every {2} second(s). '
+          '(press control+c to quit.)'.format(bind, port, interval))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sampler.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve system health metrics for Prometheus.')
+    parser.add_argument('--port', type=int, default=9110, help='port to listen on (default: 9110)')
+    parser.add_argument('--bind', default='0.0.0.0', help='address to listen on (default: 0.0.0.0)')
+    parser.add_argument('--interval', type=float, default=5, help='seconds between samples (default: 5)')
+    parser.add_argument('--disk-timeout', type=float, default=2.0, help='seconds to wait for disk probes (default: 2)')
+    parser.add_argument('--rules', metavar='FILE', help='utilization_alert json rules file (default: the built in rules)')
+    args = parser.parse_args()
+    if args.interval <= 0 or args.disk_timeout <= 0:
+        parser.error('--interval and --disk-timeout must be positive')
+    try:
+        rules = utilization_alert.load_rules(args.rules)
+    except utilization_alert.RuleError as err:
+        parser.error(str(err))
+
+    serve(args.port, args.bind, args.interval, args.disk_timeout, rules)
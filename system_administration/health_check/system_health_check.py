@@ -1,3 +1,8 @@
+from concurrent.futures import Future, wait
+from collections import deque, namedtuple
+from functools import lru_cache
+import threading
+import argparse
 import socket
 import psutil
 import time
@@ -9,11 +14,27 @@ Author:         Nick Loden
 Last Update:    02/27/2021
 
 Description:    This script will provide basic system information and utilization statistics that one could use
-                to determine the overall health of said system.
-
-Input:          None
-
-Standard Form:  python system_health_check.py
+                to determine the overall health of said system. With --daemon it keeps running as a collector:
+                cpu, memory, swap, disk and load are sampled on a fixed interval (cpu utilization is measured as
+                the delta since the previous sample, so sampling never blocks), static facts such as the hostname
+                and core counts are looked up once, and samples are kept in a bounded in memory time series that
+                HealthSampler.latest() and HealthSampler.samples() read without waiting on the system.
+
+                Mounted disks are probed concurrently with a time limit, so a hung nfs or fuse mount cannot block
+                the report. Pseudo, overlay and container filesystems are skipped by default. A mount that does not
+                answer in time is reported from its last successful probe and marked stale, or as unknown if it never
+                answered, and remote mounts are only re-probed once their cached result is older than a minute. Probes
+                run on daemon threads, so a mount that stays hung does not keep the script from exiting.
+
+Input:          --daemon    = optional, keep sampling until control+c instead of reporting once
+                --interval  = optional seconds between samples in daemon mode (default: 5)
+                --history   = optional number of samples kept in memory in daemon mode (default: 720)
+                --disk-timeout    = optional seconds to wait for disk probes (default: 2)
+                --exclude-fstypes = optional comma separated filesystem types to skip, or "" to probe every mount
+                                    (default: pseudo, overlay and container filesystems)
+
+Standard Form:  python system_health_check.py [--daemon [--interval <seconds>] [--history <samples>]]
+                    [--disk-timeout <seconds>] [--exclude-fstypes <type,type...>]
 
 Installation/Configuration Guidance:
 
@@ -58,7 +79,8 @@ def get_cpu_arch():
 
 
 def get_cpu_util(poll_time=1):
-    """returns current cpu utilization."""
+    """returns current cpu utilization. a poll_time of None returns the utilization since the previous call without
+    blocking."""
     return psutil.cpu_percent(poll_time)
 
 
@@ -104,6 +126,12 @@ def get_network_interfaces():
     return interfaces
 
 
+def get_network_io():
+    """returns dictionary of network interface to its cumulative (bytes sent, bytes received, packets sent, packets
+    received, errors in, errors out, drops in, drops out) counters."""
+    return {interface: tuple(counters) for interface, counters in psutil.net_io_counters(pernic=True).items()}
+
+
 def get_active_users():
     """returns list of users currently logged into system."""
     user_list = []
@@ -112,64 +140,248 @@ def get_active_users():
     return user_list
 
 
-def get_disk_util():
-    """returns list of all mounted disk partitions and their utilization."""
-    disk_partitions = {}
+# filesystem types skipped when probing disks: kernel pseudo filesystems, memory backed and container layers
+EXCLUDED_FSTYPES = frozenset([
+    'autofs', 'binfmt_misc', 'bpf', 'cgroup', 'cgroup2', 'configfs', 'debugfs', 'devpts', 'devtmpfs', 'efivarfs',
+    'fusectl', 'hugetlbfs', 'mqueue', 'nsfs', 'overlay', 'proc', 'pstore', 'ramfs', 'rpc_pipefs', 'securityfs',
+    'squashfs', 'sysfs', 'tmpfs', 'tracefs', 'aufs', 'fuse.lxcfs',
+])
+# filesystem types whose probes go over the network. their results are reused for REMOTE_DISK_TTL seconds
+REMOTE_FSTYPES = frozenset(['nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'sshfs', 'fuse.sshfs', 'glusterfs', 'ceph', '9p'])
+REMOTE_DISK_TTL = 60
 
-    # find all mounted disk partitions on system
-    for partition in psutil.disk_partitions():
-        try:
-            # extract second element in tuple and set as mount_point value
-            mount_point = partition[1]
+_disk_lock = threading.Lock()
+_disk_cache = {}  # mount point -> (probe time, [total GB, free GB, percent used])
+_disk_probes = {}  # mount point -> future of the probe still running for it
 
-            # pull disk statistics from current mount point
-            disk_total, disk_used, disk_free, disk_percent_used = psutil.disk_usage(mount_point)
 
-            # convert bytes to GB
-            disk_total_gb = int(disk_total) / 1000000000
-            disk_free_gb = int(disk_free) / 1000000000
+def probe_disk(mount_point):
+    """returns [total GB, free GB, percent used] of one mount point, and caches the result."""
+    # pull disk statistics from current mount point
+    disk_total, disk_used, disk_free, disk_percent_used = psutil.disk_usage(mount_point)
 
-            # add current partition name (key) and stats as list (value) to return dictionary
-            disk_partitions[mount_point] = [disk_total_gb, disk_free_gb, disk_percent_used]
-        except Exception:  # if cannot access partition, continue on
-            pass
+    # convert bytes to GB
+    disk_total_gb = int(disk_total) / 1000000000
+    disk_free_gb = int(disk_free) / 1000000000
+
+    stats = [disk_total_gb, disk_free_gb, disk_percent_used]
+    with _disk_lock:
+        _disk_cache[mount_point] = (time.time(), stats)
+    return stats
+
+
+def _run_probe(mount_point, future):
+    try:
+        future.set_result(probe_disk(mount_point))
+    except Exception as error:
+        future.set_exception(error)
+    finally:
+        with _disk_lock:
+            if _disk_probes.get(mount_point) is future:
+                del _disk_probes[mount_point]
+
+
+def _start_probe(mount_point):
+    """probe a mount point on a daemon thread, which the interpreter does not wait for at exit if the mount hangs.
+    returns the future of the probe."""
+    future = Future()
+    future.set_running_or_notify_cancel()
+    threading.Thread(target=_run_probe, args=(mount_point, future), name='disk-probe', daemon=True).start()
+    return future
+
+
+def get_disk_util(timeout=2.0, exclude_fstypes=EXCLUDED_FSTYPES):
+    """
+    returns dictionary of mounted disk partitions and their utilization. every mount is probed concurrently and the
+    call returns within `timeout` seconds even if a mount hangs.
+    :param timeout: seconds to wait for the probes.
+    :param exclude_fstypes: filesystem types to skip.
+    :return: dictionary of mount point to [total GB, free GB, percent used, stale], where stale is None for a fresh
+    result, or the age in seconds of the cached result reported in its place. mounts that have never answered in time
+    map to None.
+    """
+    disk_partitions = {}
+    now = time.time()
+    futures = {}
+
+    # find all mounted disk partitions on system, once per mount point
+    partitions = {}
+    for partition in psutil.disk_partitions(all=True):
+        if partition.fstype not in exclude_fstypes:
+            partitions.setdefault(partition.mountpoint, partition.fstype)
+
+    with _disk_lock:
+        for mount_point, fstype in partitions.items():
+            cached = _disk_cache.get(mount_point)
+            if fstype in REMOTE_FSTYPES and cached is not None and now - cached[0] < REMOTE_DISK_TTL:
+                continue
+            # a mount whose previous probe is still hung is not probed again until that probe returns
+            future = _disk_probes.get(mount_point)
+            if future is None:
+                future = _start_probe(mount_point)
+                _disk_probes[mount_point] = future
+            futures[mount_point] = future
+
+    wait(futures.values(), timeout=timeout)
+
+    for mount_point in partitions:
+        future = futures.get(mount_point)
+        if future is not None and future.done() and future.exception() is None:
+            disk_partitions[mount_point] = future.result() + [None]
+            continue
+        if future is not None and future.done():
+            continue  # if cannot access partition, continue on
+
+        # the probe did not finish in time (or was not needed), report the last known result instead
+        with _disk_lock:
+            cached = _disk_cache.get(mount_point)
+        if cached is not None:
+            disk_partitions[mount_point] = cached[1] + [now - cached[0]]
+        else:
+            disk_partitions[mount_point] = None
 
     return disk_partitions
 
 
-def health_check():
-    """combine health check functions and output results"""
-    # call other functions and assign return values to local variables
-    hostname = get_hostname()
-    ip_addr = get_ipv4_addr()
-    os = get_os()
-    boot_time = get_boot_time()
+@lru_cache(maxsize=None)
+def get_static_facts():
+    """returns facts that do not change while the system is up. they are looked up once and cached."""
     physical_cores, logical_cores = get_core_counts()
-    cpu_arch = get_cpu_arch()
-    network_interfaces = get_network_interfaces()
-    cpu_util = get_cpu_util()
-    one, five, fifteen = get_cpu_load_avg()
-    total_mem, avail_mem, percent_used_mem = get_memory_util()
-    total_swap, avail_swap, percent_used_swap = get_swap_util()
-    disk_partition_dict = get_disk_util()
-    active_user_list = get_active_users()
+    return {
+        'hostname': get_hostname(),
+        'ip_addr': get_ipv4_addr(),
+        'os': get_os(),
+        'boot_time': get_boot_time(),
+        'physical_cores': physical_cores,
+        'logical_cores': logical_cores,
+        'cpu_arch': get_cpu_arch(),
+        'network_interfaces': get_network_interfaces(),
+    }
+
+
+HealthSample = namedtuple('HealthSample', ['timestamp', 'cpu_util', 'load_avg', 'memory', 'swap', 'disks', 'network',
+                                           'users'])
+
+
+def take_sample(cpu_poll_time=None, disk_timeout=2.0, exclude_fstypes=EXCLUDED_FSTYPES):
+    """
+    take_sample collects one set of utilization statistics.
+    :param cpu_poll_time: seconds to measure cpu utilization over. None (the default) measures since the previous
+    call instead of blocking.
+    :param disk_timeout: seconds to wait for disk probes.
+    :param exclude_fstypes: filesystem types that are not probed.
+    :return: HealthSample named tuple. memory and swap are (total GB, available GB, percent used) tuples, and disks
+    is the dictionary returned by get_disk_util. network is the dictionary returned by get_network_io.
+    """
+    return HealthSample(
+        timestamp=time.time(),
+        cpu_util=get_cpu_util(cpu_poll_time),
+        load_avg=get_cpu_load_avg(),
+        memory=get_memory_util(),
+        swap=get_swap_util(),
+        disks=get_disk_util(disk_timeout, exclude_fstypes),
+        network=get_network_io(),
+        users=get_active_users(),
+    )
+
+
+class HealthSampler:
+    """
+    HealthSampler takes a HealthSample on a fixed interval in a background thread and keeps the most recent samples
+    in memory.
+    """
+
+    def __init__(self, interval=5, history=720, disk_timeout=2.0, exclude_fstypes=EXCLUDED_FSTYPES):
+        """
+        :param interval: seconds between samples.
+        :param history: number of samples kept. the oldest sample is dropped when a new one arrives.
+        :param disk_timeout: seconds to wait for disk probes on each sample.
+        :param exclude_fstypes: filesystem types that are not probed.
+        """
+        self.interval = interval
+        self.disk_timeout = disk_timeout
+        self.exclude_fstypes = exclude_fstypes
+        self.series = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        """take a sample now and add it to the time series. returns the new sample."""
+        sample = take_sample(disk_timeout=self.disk_timeout, exclude_fstypes=self.exclude_fstypes)
+        with self._lock:
+            self.series.append(sample)
+        return sample
+
+    def latest(self):
+        """returns the most recent sample, or None if nothing was sampled yet."""
+        with self._lock:
+            return self.series[-1] if self.series else None
+
+    def samples(self, since=None):
+        """returns the samples in the time series, oldest first, optionally only those taken at or after `since`."""
+        with self._lock:
+            samples = list(self.series)
+        if since is not None:
+            samples = [sample for sample in samples if sample.timestamp >= since]
+        return samples
+
+    def run(self, callback=None):
+        """
+        run samples until stop() is called. ticks are scheduled on the monotonic clock so the time spent sampling
+        does not make the interval drift; an overrunning sample skips ahead instead of sampling back to back.
+        :param callback: optional function called with every new sample.
+        :return: None
+        """
+        # prime the cpu counters so the first sample reports the utilization since now, not since boot
+        get_cpu_util(None)
+        get_static_facts()
+        next_tick = time.monotonic() + self.interval
+        while not self._stop.wait(max(0.0, next_tick - time.monotonic())):
+            sample = self.sample()
+            if callback is not None:
+                callback(sample)
+            next_tick += self.interval
+            now = time.monotonic()
+            if next_tick < now:
+                next_tick = now + self.interval - ((now - next_tick) % self.interval)
+
+    def start(self, callback=None):
+        """start sampling in a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, args=(callback,), name='health-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """stop sampling and wait for the sampling thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def print_report(facts, sample):
+    """output the static facts and one sample as a health report"""
+    one, five, fifteen = sample.load_avg
+    total_mem, avail_mem, percent_used_mem = sample.memory
+    total_swap, avail_swap, percent_used_swap = sample.swap
 
     # print output
     print(' -------------')
     print('| System Info |')
     print(' -------------')
-    print('Hostname: {}'.format(hostname))
-    print('IPv4 Address: {}'.format(ip_addr))
-    print('OS: {}'.format(os))
-    print('Boot Time: {}'.format(boot_time))
-    print('CPU: Physical Cores: {} | Logical Cores: {} | Arch: {}'.format(physical_cores, logical_cores, cpu_arch))
-    print('Network Interfaces: {}'.format(', '.join(network_interfaces)))
+    print('Hostname: {}'.format(facts['hostname']))
+    print('IPv4 Address: {}'.format(facts['ip_addr']))
+    print('OS: {}'.format(facts['os']))
+    print('Boot Time: {}'.format(facts['boot_time']))
+    print('CPU: Physical Cores: {} | Logical Cores: {} | Arch: {}'.format(facts['physical_cores'], facts['logical_cores'], facts['cpu_arch']))
+    print('Network Interfaces: {}'.format(', '.join(facts['network_interfaces'])))
     print('')
 
     print(' -----')
     print('| CPU |')
     print(' -----')
-    print('Current system wide CPU utilization: {}%'.format(cpu_util))
+    print('Current system wide CPU utilization: {}%'.format(sample.cpu_util))
     print('1, 5, and 15 min CPU load averages: {}%, {}%, {}%'.format(one, five, fifteen))
     print('')
 
@@ -188,8 +400,15 @@ def health_check():
     print(' ------')
     print('| Disk |')
     print(' ------')
-    for disk_partion, disk_stats in disk_partition_dict.items():
-        print('Partition: {}'.format(disk_partion))
+    for disk_partion, disk_stats in sample.disks.items():
+        if disk_stats is None:
+            print('Partition: {} (unknown: no response)'.format(disk_partion))
+            print('')
+            continue
+        if disk_stats[3] is not None:
+            print('Partition: {} (stale: no response, last probed {:.0f} seconds ago)'.format(disk_partion, disk_stats[3]))
+        else:
+            print('Partition: {}'.format(disk_partion))
         print('Total Size: {:.2f} GB | Disk Free: {:.2f} GB | Used: {} %'.format(disk_stats[0], disk_stats[1], disk_stats[2]))
         print('')
     print('')
@@ -197,8 +416,61 @@ def health_check():
     print(' --------------')
     print('| Active Users |')
     print(' --------------')
-    print(', '.join(active_user_list))
+    print(', '.join(sample.users))
+
+
+def format_sample_line(sample):
+    """returns a one line summary of a sample"""
+    disks = ' '.join('{} unknown'.format(mount_point) if stats is None else
+                     '{} {}%{}'.format(mount_point, stats[2], '' if stats[3] is None else ' (stale)')
+                     for mount_point, stats in sample.disks.items())
+    return '{} | CPU: {:5.1f}% | Load: {:.2f} | Memory: {:5.1f}% | Swap: {:5.1f}% | Disk: {}'.format(
+        time.strftime('%H:%M:%S', time.localtime(sample.timestamp)), sample.cpu_util, sample.load_avg[0],
+        sample.memory[2], sample.swap[2], disks)
+
+
+def health_check(disk_timeout=2.0, exclude_fstypes=EXCLUDED_FSTYPES):
+    """combine health check functions and output results"""
+    print_report(get_static_facts(), take_sample(1, disk_timeout, exclude_fstypes))
+
+
+def health_daemon(interval=5, history=720, disk_timeout=2.0, exclude_fstypes=EXCLUDED_FSTYPES):
+    """sample continuously, printing a summary line per sample, and output a full report on control+c"""
+    sampler = HealthSampler(interval, history, disk_timeout, exclude_fstypes)
+    print('Sampling every {} second(s), keeping the last {} samples. (press control+c to quit.)'.format(interval, history))
+    try:
+        sampler.run(callback=lambda sample: print(format_sample_line(sample), flush=True))
+    except KeyboardInterrupt:
+        pass
+
+    samples = sampler.samples()
+    if not samples:
+        return
+    print('')
+    print_report(get_static_facts(), samples[-1])
+    cpu = [sample.cpu_util for sample in samples]
+    memory = [sample.memory[2] for sample in samples]
+    print('')
+    print('Over {} samples: CPU avg {:.1f}% max {:.1f}% | Memory avg {:.1f}% max {:.1f}%'.format(
+        len(samples), sum(cpu) / len(cpu), max(cpu), sum(memory) / len(memory), max(memory)))
 
 
 if __name__ == '__main__':
-    health_check()
+    parser = argparse.ArgumentParser(description='Report system information and utilization statistics.')
+    parser.add_argument('--daemon', action='store_true', help='keep sampling until control+c instead of reporting once')
+    parser.add_argument('--interval', type=float, default=5, help='seconds between samples in daemon mode (default: 5)')
+    parser.add_argument('--history', type=int, default=720, help='number of samples kept in memory in daemon mode (default: 720)')
+    parser.add_argument('--disk-timeout', type=float, default=2.0, help='seconds to wait for disk probes (default: 2)')
+    parser.add_argument('--exclude-fstypes', help='comma separated filesystem types to skip, or "" to probe every '
+                                                  'mount (default: pseudo, overlay and container filesystems)')
+    args = parser.parse_args()
+    if args.interval <= 0 or args.history < 1 or args.disk_timeout <= 0:
+        parser.error('--interval, --history and --disk-timeout must be positive')
+    exclude_fstypes = EXCLUDED_FSTYPES
+    if args.exclude_fstypes is not None:
+        exclude_fstypes = frozenset(fstype.strip() for fstype in args.exclude_fstypes.split(',') if fstype.strip())
+
+    if args.daemon:
+        health_daemon(args.interval, args.history, args.disk_timeout, exclude_fstypes)
+    else:
+        health_check(args.disk_timeout, exclude_fstypes)
@@ -1,18 +1,44 @@
-import shutil
-import psutil
+from collections import deque, namedtuple
+from functools import lru_cache
+import system_health_check
+import argparse
+import fnmatch
 import socket
+import json
+import time
 
 """
 Author:         Nick Loden
 
-Last Update:    02/27/2021
+Last Update:    10/18/2026
 
 Description:    This script will check several resources on the system and generate an alert if a utilization threshold
-                has been exceeded.
+                has been exceeded. Thresholds come from a json rules file (or the defaults below), and disk rules apply
+                to every mounted file system unless limited to specific mount points. With --watch the system is
+                sampled on a fixed interval by a single sampling loop, every rule is evaluated over a sliding window
+                of samples, a rule only fires once its condition has held for its sustained-for duration, and it
+                only clears once the value is back past its separate clear threshold (hysteresis). Each rule and
+                mount point reports only its state transitions (FIRING and RESOLVED), so a condition that stays bad
+                is reported once instead of on every sample.
 
-Input:          None
+                Rules file format (a json list):
+                    [
+                        {"name": "cpu_high", "metric": "cpu_percent", "above": 80, "clear": 70, "window": 60, "for": 30},
+                        {"name": "disk_low", "metric": "disk_free_percent", "below": 20, "clear": 25, "mounts": ["/", "/data*"]},
+                        {"name": "memory_low", "metric": "memory_available_mb", "below": 500, "aggregate": "max"}
+                    ]
 
-Standard Form:  python utilization_alert.py
+                metric is one of cpu_percent, load_1m, load_5m, load_15m, memory_used_percent, memory_available_mb,
+                swap_used_percent, disk_used_percent or disk_free_percent. above/below is the alert threshold, clear
+                the threshold that resolves it (default: the alert threshold), window the seconds of samples combined
+                with aggregate (avg, min or max, default avg), and for the seconds the condition must hold before the
+                rule fires.
+
+Input:          --rules     = optional json rules file (default: the built in rules)
+                --watch     = optional, keep sampling and report state transitions until control+c
+                --interval  = optional seconds between samples with --watch (default: 5)
+
+Standard Form:  python utilization_alert.py [--rules <file>] [--watch [--interval <seconds>]]
 
 Installation/Configuration Guidance:
 
@@ -24,27 +50,202 @@ Installation/Configuration Guidance:
 """
 
 
-issues = []
+DEFAULT_RULES = [
+    {'name': 'cpu_high', 'metric': 'cpu_percent', 'above': 80, 'clear': 70, 'window': 60, 'for': 30},
+    {'name': 'disk_low', 'metric': 'disk_free_percent', 'below': 20, 'clear': 25},
+    {'name': 'memory_low', 'metric': 'memory_available_mb', 'below': 500, 'clear': 600, 'window': 30},
+]
+
+# each metric returns a dictionary of target (a mount point for disk metrics, '' otherwise) to value. disk metrics
+# leave out zero-size (pseudo and empty) mounts, which have no free space to run low on
+METRICS = {
+    'cpu_percent': lambda sample: {'': sample.cpu_util},
+    'load_1m': lambda sample: {'': sample.load_avg[0]},
+    'load_5m': lambda sample: {'': sample.load_avg[1]},
+    'load_15m': lambda sample: {'': sample.load_avg[2]},
+    'memory_used_percent': lambda sample: {'': sample.memory[2]},
+    'memory_available_mb': lambda sample: {'': sample.memory[1] * 1000},
+    'swap_used_percent': lambda sample: {'': sample.swap[2]},
+    'disk_used_percent': lambda sample: {mount: stats[2] for mount, stats in sample.disks.items()
+                                         if stats is not None and stats[0]},
+    'disk_free_percent': lambda sample: {mount: stats[1] / stats[0] * 100 for mount, stats in sample.disks.items()
+                                         if stats is not None and stats[0]},
+}
+# each aggregate combines the (timestamp, value) pairs of a window and their running total
+AGGREGATES = {
+    'avg': lambda values, total: total / len(values),
+    'min': lambda values, total: min(value for _, value in values),
+    'max': lambda values, total: max(value for _, value in values),
+}
+
+Rule = namedtuple('Rule', ['name', 'metric', 'above', 'threshold', 'clear', 'window', 'aggregate', 'sustain', 'mounts'])
+Transition = namedtuple('Transition', ['timestamp', 'rule', 'target', 'state', 'value'])
+
+OK = 'OK'
+PENDING = 'PENDING'
+FIRING = 'FIRING'
+RESOLVED = 'RESOLVED'
+
+
+class RuleError(Exception):
+    """raised when a rules file is missing, malformed, or contains an invalid rule."""
+
+
+def parse_rule(spec):
+    """
+    parse_rule validates one rule dictionary.
+    :param spec: dictionary with name, metric and either above or below, plus optional clear, window, aggregate, for
+    and mounts keys.
+    :return: Rule named tuple.
+    """
+    if not isinstance(spec, dict) or spec.get('metric') not in METRICS or ('above' in spec) == ('below' in spec):
+        raise RuleError('rule needs a known metric and exactly one of above or below: {}'.format(spec))
+    above = 'above' in spec
+    try:
+        threshold = float(spec['above' if above else 'below'])
+        clear = float(spec.get('clear', threshold))
+        window = float(spec.get('window', 0))
+        sustain = float(spec.get('for', 0))
+    except (TypeError, ValueError):
+        raise RuleError('rule thresholds and durations must be numbers: {}'.format(spec))
+    if (above and clear > threshold) or (not above and clear < threshold):
+        raise RuleError('clear must be on the healthy side of the alert threshold: {}'.format(spec))
+    if window < 0 or sustain < 0:
+        raise RuleError('window and for must not be negative: {}'.format(spec))
+    aggregate = spec.get('aggregate', 'avg')
+    if aggregate not in AGGREGATES:
+        raise RuleError('aggregate must be one of {}: {}'.format(', '.join(AGGREGATES), spec))
+    mounts = spec.get('mounts')
+    if mounts is not None and (not isinstance(mounts, list) or not spec['metric'].startswith('disk_')):
+        raise RuleError('mounts must be a list, and only applies to disk metrics: {}'.format(spec))
+    name = str(spec.get('name', spec['metric']))
+    return Rule(name, spec['metric'], above, threshold, clear, window, aggregate, sustain, tuple(mounts or ()))
+
+
+@lru_cache(maxsize=None)
+def default_rules():
+    """returns the built in rules, parsed once."""
+    return tuple(parse_rule(spec) for spec in DEFAULT_RULES)
+
+
+def load_rules(path=None):
+    """returns the list of rules in a json rules file, or the default rules if no path is given."""
+    if path is None:
+        return list(default_rules())
+    try:
+        with open(path) as f:
+            specs = json.load(f)
+    except (OSError, ValueError) as err:
+        raise RuleError('unable to read {}: {}'.format(path, err))
+    if not isinstance(specs, list):
+        raise RuleError('{} must contain a list of rules'.format(path))
+    rules = [parse_rule(spec) for spec in specs]
+    names = [rule.name for rule in rules]
+    if len(set(names)) != len(names):
+        raise RuleError('rule names in {} must be unique'.format(path))
+    return rules
+
+
+class RuleState:
+    """
+    RuleState is the sliding window and alert state of one rule for one target.
+    """
+
+    def __init__(self):
+        self.values = deque()  # (timestamp, value), oldest first
+        self.total = 0.0
+        self.state = OK
+        self.since = None  # when the condition started to hold
 
+    def add(self, timestamp, value, window):
+        """adds a value and drops values that have fallen out of the window, keeping at least the newest."""
+        self.values.append((timestamp, value))
+        self.total += value
+        while self.values[0][0] <= timestamp - window and len(self.values) > 1:
+            self.total -= self.values.popleft()[1]
 
-def check_cpu():
-    """returns True if the current cpu utilization is below 80%"""
-    usage = psutil.cpu_percent(1)
-    return usage < 80
 
+class AlertEvaluator:
+    """
+    AlertEvaluator evaluates a set of rules against each new sample and returns the state transitions they cause.
+    """
 
-def check_disk():
-    """returns True if the root file system has greater than 20% of available disk space"""
-    du = shutil.disk_usage('/')
-    free = du.free / du.total * 100
-    return free > 20
+    def __init__(self, rules):
+        self.rules = rules
+        self.states = {}  # (rule name, target) -> RuleState
 
+    def evaluate(self, sample):
+        """
+        evaluate applies every rule to a system_health_check.HealthSample.
+        :return: list of Transition named tuples, one per rule and target that started FIRING or RESOLVED.
+        """
+        transitions = []
+        seen = set()
+        for rule in self.rules:
+            for target, value in METRICS[rule.metric](sample).items():
+                if rule.mounts and not any(fnmatch.fnmatchcase(target, pattern) for pattern in rule.mounts):
+                    continue
+                key = (rule.name, target)
+                seen.add(key)
+                state = self.states.get(key)
+                if state is None:
+                    state = self.states[key] = RuleState()
+                state.add(sample.timestamp, value, rule.window)
+                value = AGGREGATES[rule.aggregate](state.values, state.total)
 
-def check_mem():
-    """returns True if the amount of available memory is greater than 500 MB"""
-    mem = psutil.virtual_memory()
-    available = mem.available / 1000000
-    return available > 500
+                breached = value > rule.threshold if rule.above else value < rule.threshold
+                cleared = value <= rule.clear if rule.above else value >= rule.clear
+                if state.state == FIRING:
+                    if cleared:
+                        state.state, state.since = OK, None
+                        transitions.append(Transition(sample.timestamp, rule, target, RESOLVED, value))
+                elif breached:
+                    if state.since is None:
+                        state.state, state.since = PENDING, sample.timestamp
+                    if sample.timestamp - state.since >= rule.sustain:
+                        state.state = FIRING
+                        transitions.append(Transition(sample.timestamp, rule, target, FIRING, value))
+                else:
+                    state.state, state.since = OK, None
+
+        # a mount that was unmounted while firing is resolved rather than left firing forever
+        for key in [key for key in self.states if key not in seen]:
+            state = self.states.pop(key)
+            if state.state == FIRING:
+                rule = next(rule for rule in self.rules if rule.name == key[0])
+                transitions.append(Transition(sample.timestamp, rule, key[1], RESOLVED, None))
+        return transitions
+
+    def firing(self):
+        """returns the (rule name, target) keys currently firing."""
+        return [key for key, state in self.states.items() if state.state == FIRING]
+
+
+def check_sample(sample, rules=None):
+    """
+    check_sample applies rules to a single system_health_check.HealthSample, ignoring their windows and sustained-for
+    durations.
+    :param rules: list of Rule named tuples, loaded once by the caller (default: the built in rules).
+    :return: dictionary of (rule name, target) to True if the check passed.
+    """
+    results = {}
+    for rule in default_rules() if rules is None else rules:
+        for target, value in METRICS[rule.metric](sample).items():
+            if rule.mounts and not any(fnmatch.fnmatchcase(target, pattern) for pattern in rule.mounts):
+                continue
+            results[(rule.name, target)] = not (value > rule.threshold if rule.above else value < rule.threshold)
+    return results
+
+
+def format_transition(transition):
+    """returns a one line description of a state transition."""
+    rule = transition.rule
+    target = ' on {}'.format(transition.target) if transition.target else ''
+    value = 'gone' if transition.value is None else '{:.1f}'.format(transition.value)
+    return '{} {} {}{}: {} {} is {} (alert {} {:g}, clear at {:g})'.format(
+        time.strftime('%H:%M:%S', time.localtime(transition.timestamp)), transition.state, rule.name, target,
+        rule.aggregate if rule.window else 'current', rule.metric, value, 'above' if rule.above else 'below',
+        rule.threshold, rule.clear)
 
 
 def check_localhost():
@@ -53,21 +254,61 @@ def check_localhost():
     return localhost == '127.0.0.1'
 
 
-if __name__ == '__main__':
-    if not check_cpu():
-        issues.append('CPU usages is over 80%')
-
-    if not check_disk():
-        issues.append('Available disk space of root volume is less than 20%')
-
-    if not check_mem():
-        issues.append('Available memory is less than 500 MB')
+def check_once(rules):
+    """sample once and print an error for every rule that is breached right now"""
+    issues = []
+    sample = system_health_check.take_sample(cpu_poll_time=1)
+    for rule in rules:
+        for target, value in METRICS[rule.metric](sample).items():
+            if rule.mounts and not any(fnmatch.fnmatchcase(target, pattern) for pattern in rule.mounts):
+                continue
+            if value > rule.threshold if rule.above else value < rule.threshold:
+                issues.append('{}{}: {} is {:.1f} ({} {:g})'.format(
+                    rule.name, ' on {}'.format(target) if target else '', rule.metric, value,
+                    'above' if rule.above else 'below', rule.threshold))
 
     if not check_localhost():
         issues.append('Localhost cannot be resolved')
 
-    if issues:
-        for issue in issues:
-            print('Error: {}'.format(issue))
+    for issue in issues:
+        print('Error: {}'.format(issue))
+
+
+def watch(rules, interval=5):
+    """sample on a fixed interval and print every alert state transition until control+c"""
+    evaluator = AlertEvaluator(rules)
+    sampler = system_health_check.HealthSampler(interval, history=1)
+
+    def report(sample):
+        for transition in evaluator.evaluate(sample):
+            print(format_transition(transition), flush=True)
+
+    print('Evaluating {} rule(s) every {} second(s). (press control+c to quit.)'.format(len(rules), interval))
+    try:
+        sampler.run(callback=report)
+    except KeyboardInterrupt:
+        pass
+    firing = evaluator.firing()
+    if firing:
+        print('Still firing: {}'.format(', '.join('{}{}'.format(name, ' on {}'.format(target) if target else '')
+                                                  for name, target in firing)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Alert when system utilization crosses configured thresholds.')
+    parser.add_argument('--rules', metavar='FILE', help='json rules file (default: the built in rules)')
+    parser.add_argument('--watch', action='store_true', help='keep sampling and report state transitions until control+c')
+    parser.add_argument('--interval', type=float, default=5, help='seconds between samples with --watch (default: 5)')
+    args = parser.parse_args()
+    if args.interval <= 0:
+        parser.error('--interval must be positive')
 
+    try:
+        rules = load_rules(args.rules)
+    except RuleError as err:
+        parser.error(str(err))
 
+    if args.watch:
+        watch(rules, args.interval)
+    else:
+        check_once(rules)
@@ -0,0 +1,321 @@
+import asyncio
+import time
+import tcp_test
+
+"""
+Author:         Nick Loden
+
+Last Update:    10/18/2026
+
+Description:    This script provides application level probes for the service status report. A tcp connect only shows
+                that something is listening, so a hung web app still looks online. Besides the plain tcp probe of
+                tcp_test.py, a service can be probed with:
+                    http    - GET a path and check the response status and, optionally, a substring of the body
+                    redis   - send PING and expect PONG
+                Every probe type can carry its own latency SLO (slo_ms), above which the service is reported as slow.
+
+                http and redis probes run on pooled keep-alive connections: a Prober keeps a small pool of idle
+                connections per (host, port) and one event loop for its lifetime, so probing every few seconds reuses
+                the same sockets instead of opening and closing one per probe. A pooled connection that the server has
+                closed in the meantime is dropped and the request is retried on another connection.
+
+Input:          a list of (host, probe spec) pairs, where a probe spec is a tcp port or a dictionary like
+                    {"type": "http", "port": 5000, "path": "/", "expect_status": 200, "expect_body": "ok", "slo_ms": 300}
+                    {"type": "redis", "port": 6379, "slo_ms": 50}
+
+Standard Form:  import app_probes
+                prober = app_probes.Prober(timeout=1, concurrency=100)
+                prober.probe([('localhost', {'type': 'redis', 'port': 6379}), ('localhost', 80)])
+                prober.close()
+
+"""
+
+
+PROBE_TYPES = ('tcp', 'http', 'redis')
+MAX_IDLE_PER_HOST = 4  # idle connections kept per (host, port)
+IDLE_TIMEOUT = 60  # seconds an idle connection is kept before it is closed instead of reused
+MAX_BODY = 1048576  # bytes of an http response body read. larger bodies are truncated and the connection is closed
+USER_AGENT = 'service-status-report'
+
+
+class ProbeError(Exception):
+    """raised when a service answers, but not with the expected response."""
+
+
+def parse_probe(spec):
+    """
+    parse_probe validates a probe spec and fills in its defaults.
+    :param spec: tcp port, or dictionary with a type, a port and the settings of that type.
+    :return: dictionary with type, port, slo_ms (None to use the report default) and, for http, path, expect_status
+    and expect_body.
+    """
+    if isinstance(spec, int) and not isinstance(spec, bool):
+        spec = {'type': 'tcp', 'port': spec}
+    if not isinstance(spec, dict):
+        raise ValueError('a probe must be a port or a dictionary, not {!r}'.format(spec))
+    probe = {'type': spec.get('type', 'tcp'), 'port': spec.get('port'), 'slo_ms': spec.get('slo_ms')}
+    if probe['type'] not in PROBE_TYPES:
+        raise ValueError('unknown probe type {!r}, expected one of {}'.format(probe['type'], ', '.join(PROBE_TYPES)))
+    if not isinstance(probe['port'], int) or not 0 < probe['port'] < 65536:
+        raise ValueError('probe port must be between 1 and 65535, not {!r}'.format(probe['port']))
+    if probe['slo_ms'] is not None and (not isinstance(probe['slo_ms'], (int, float)) or isinstance(probe['slo_ms'], bool)
+                                        or probe['slo_ms'] <= 0):
+        raise ValueError('slo_ms must be a positive number, not {!r}'.format(probe['slo_ms']))
+    if probe['type'] == 'http':
+        probe['path'] = spec.get('path', '/')
+        probe['expect_status'] = spec.get('expect_status', 200)
+        probe['expect_body'] = spec.get('expect_body')
+        if not isinstance(probe['path'], str) or not probe['path'].startswith('/'):
+            raise ValueError('http probe path must start with /, not {!r}'.format(probe['path']))
+        if not isinstance(probe['expect_status'], int) or isinstance(probe['expect_status'], bool):
+            raise ValueError('expect_status must be an http status code, not {!r}'.format(probe['expect_status']))
+        if probe['expect_body'] is not None and not isinstance(probe['expect_body'], str):
+            raise ValueError('expect_body must be a string, not {!r}'.format(probe['expect_body']))
+    unknown = set(spec) - set(probe) - {'type'}
+    if unknown:
+        raise ValueError('unknown {} probe setting(s): {}'.format(probe['type'], ', '.join(sorted(unknown))))
+    return probe
+
+
+class Connection:
+    """one pooled connection: its streams, the address it connected to and when it was last released."""
+
+    def __init__(self, address, reader, writer):
+        self.address = address
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = time.monotonic()
+
+    def usable(self):
+        return (not self.writer.is_closing() and not self.reader.at_eof()
+                and time.monotonic() - self.idle_since < IDLE_TIMEOUT)
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """
+    ConnectionPool keeps up to MAX_IDLE_PER_HOST idle keep-alive connections per (host, port). It belongs to one event
+    loop, since asyncio streams cannot move between loops.
+    """
+
+    def __init__(self):
+        self._idle = {}  # (host, port) -> list of idle Connection, most recently released last
+
+    async def acquire(self, host, port):
+        """returns (Connection, reused), taking an idle connection when one is still usable and connecting otherwise"""
+        idle = self._idle.get((host, port), [])
+        while idle:
+            connection = idle.pop()
+            if connection.usable():
+                return connection, True
+            connection.close()
+        addresses = await tcp_test.resolve_async(host, None)
+        address, reader, writer = await tcp_test.connect_happy_eyeballs(addresses, port)
+        return Connection(address, reader, writer), False
+
+    def release(self, host, port, connection):
+        """return a connection that is still in a known state to the pool"""
+        idle = self._idle.setdefault((host, port), [])
+        if len(idle) >= MAX_IDLE_PER_HOST or connection.writer.is_closing():
+            connection.close()
+            return
+        connection.idle_since = time.monotonic()
+        idle.append(connection)
+
+    def idle_count(self):
+        return sum(len(idle) for idle in self._idle.values())
+
+    def close(self):
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.close()
+        self._idle.clear()
+
+
+async def read_http_response(reader):
+    """
+    read_http_response reads one response from an http/1.x connection.
+    :return: (status, body, keep_alive) where keep_alive is True if the connection can carry another request.
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError('connection closed by the server')
+    try:
+        version, status = status_line.decode('latin-1').split(None, 2)[:2]
+        status = int(status)
+    except ValueError:
+        raise ProbeError('bad http response: {!r}'.format(status_line[:80]))
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n'):
+            break
+        if not line:
+            raise ConnectionResetError('connection closed in the http headers')
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    connection_header = headers.get('connection', '').lower()
+    keep_alive = connection_header == 'keep-alive' if version == 'HTTP/1.0' else connection_header != 'close'
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        chunks = []
+        size = 0
+        while True:
+            chunk_size = int((await reader.readline()).split(b';')[0], 16)
+            if chunk_size == 0:
+                # skip any trailers up to the blank line that ends the response
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            if size + chunk_size > MAX_BODY:
+                return status, b''.join(chunks), False
+            chunks.append(await reader.readexactly(chunk_size))
+            size += chunk_size
+            await reader.readline()
+        body = b''.join(chunks)
+    elif 'content-length' in headers:
+        length = int(headers['content-length'])
+        if length > MAX_BODY:
+            return status, await reader.readexactly(MAX_BODY), False
+        body = await reader.readexactly(length)
+    elif status in (204, 304) or 100 <= status < 200:
+        body = b''
+    else:
+        # no length given, so the body runs until the server closes the connection
+        body = await reader.read(MAX_BODY)
+        keep_alive = False
+    return status, body, keep_alive
+
+
+async def http_exchange(connection, host, probe):
+    """
+    send the GET request of an http probe and check the response.
+    :return: (keep_alive, error) where keep_alive is True if the connection can be reused, and error is None if the
+    response was as expected.
+    """
+    request = 'GET {} HTTP/1.1\r\nHost: {}\r\nUser-Agent: {}\r\nAccept: */*\r\nConnection: keep-alive\r\n\r\n'.format(
+        probe['path'], host if ':' not in host else '[{}]'.format(host), USER_AGENT)
+    connection.writer.write(request.encode('latin-1'))
+    await connection.writer.drain()
+    status, body, keep_alive = await read_http_response(connection.reader)
+    if status != probe['expect_status']:
+        return keep_alive, 'http {}'.format(status)
+    if probe['expect_body'] is not None and probe['expect_body'].encode('utf-8') not in body:
+        return keep_alive, 'body mismatch'
+    return keep_alive, None
+
+
+async def redis_exchange(connection, host, probe):
+    """send PING and expect PONG. returns (keep_alive, error) like http_exchange"""
+    connection.writer.write(b'*1\r\n$4\r\nPING\r\n')
+    await connection.writer.drain()
+    reply = await connection.reader.readline()
+    if not reply:
+        raise ConnectionResetError('connection closed by the server')
+    reply = reply.rstrip(b'\r\n')
+    if reply != b'+PONG':
+        # an error reply (e.g. -NOAUTH) leaves the connection in a known state, anything else does not
+        return reply.startswith(b'-'), 'redis {}'.format(reply.decode('utf-8', 'replace')[:60])
+    return True, None
+
+
+EXCHANGES = {'http': http_exchange, 'redis': redis_exchange}
+
+
+async def _pooled_exchange(pool, host, probe):
+    """
+    runs the exchange of a probe on a pooled connection. a reused connection that the server closed while it was idle
+    fails before any reply arrives, so that case is retried on the next idle connection or a new one.
+    :return: the address that answered.
+    :raises ProbeError: if the reply was not the expected one.
+    """
+    while True:
+        connection, reused = await pool.acquire(host, probe['port'])
+        keep_alive = False
+        try:
+            keep_alive, error = await EXCHANGES[probe['type']](connection, host, probe)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            if reused:
+                continue
+            raise
+        finally:
+            if keep_alive:
+                pool.release(host, probe['port'], connection)
+            else:
+                connection.close()
+        if error is not None:
+            raise ProbeError(error)
+        return connection.address
+
+
+async def probe_async(pool, host, probe, timeout, semaphore):
+    """returns a tcp_test.ProbeResult for one parsed probe spec, giving up after timeout seconds"""
+    if probe['type'] == 'tcp':
+        return await tcp_test.probe_port_async(host, probe['port'], timeout, semaphore)
+    async with semaphore:
+        start = time.monotonic_ns()
+        try:
+            await tcp_test.resolve_async(host, timeout)
+        except tcp_test.ResolveError:
+            return tcp_test.ProbeResult(host, probe['port'], False, 'dns', time.monotonic_ns() - start, None)
+
+        start = time.monotonic_ns()
+        try:
+            address = await asyncio.wait_for(_pooled_exchange(pool, host, probe), timeout)
+        except ProbeError as err:
+            return tcp_test.ProbeResult(host, probe['port'], False, str(err), time.monotonic_ns() - start, None)
+        except (asyncio.IncompleteReadError, ValueError):
+            return tcp_test.ProbeResult(host, probe['port'], False, 'bad response', time.monotonic_ns() - start, None)
+        except (OSError, asyncio.TimeoutError) as err:
+            return tcp_test.ProbeResult(host, probe['port'], False, tcp_test.failure_reason(err),
+                                        time.monotonic_ns() - start, None)
+        return tcp_test.ProbeResult(host, probe['port'], True, probe['type'], time.monotonic_ns() - start, address)
+
+
+class Prober:
+    """
+    Prober runs probes on its own event loop and keeps the connection pool of that loop between calls, so repeated
+    rounds of probing (as in the report daemon) reuse their keep-alive connections.
+    """
+
+    def __init__(self, timeout=1, concurrency=100):
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.loop = asyncio.new_event_loop()
+        self.pool = ConnectionPool()
+
+    async def _probe_all(self, targets):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # resolve every distinct host once up front, so probes of the same host share a single lookup
+        hosts = {host for host, _ in targets}
+        await asyncio.gather(*(tcp_test.resolve_async(host, self.timeout) for host in hosts), return_exceptions=True)
+        results = await asyncio.gather(*(probe_async(self.pool, host, probe, self.timeout, semaphore)
+                                         for host, probe in targets), return_exceptions=True)
+        # an unexpected error fails only the probe it came from, not the whole round
+        for index, ((host, probe), result) in enumerate(zip(targets, results)):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                reason = 'error: {}'.format(str(result) or type(result).__name__)
+                results[index] = tcp_test.ProbeResult(host, probe['port'], False, reason, 0, None)
+        return results
+
+    def probe(self, targets):
+        """
+        returns a list of tcp_test.ProbeResult, one per (host, probe spec) in targets and in the same order. latency_ns
+        is the connect time for tcp probes, and the time to get a reply (plus the connect time when no pooled
+        connection was available) for http and redis probes. reason is the probe type on success, and otherwise
+        timeout, refused, unreachable, dns, http <status>, body mismatch, redis <error>, bad response or an error message.
+        """
+        targets = [(host, parse_probe(spec)) for host, spec in targets]
+        return self.loop.run_until_complete(self._probe_all(targets))
+
+    def close(self):
+        """close every pooled connection and the event loop"""
+        self.pool.close()
+        # let the transports finish closing before the loop goes away
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.loop.close()
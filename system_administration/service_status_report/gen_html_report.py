@@ -1,67 +1,320 @@
+from collections import deque
 import os
-import tcp_test
+import html
+import json
+import time
+import argparse
+import app_probes
 
 """
 Author:         Nick Loden
 
-Last Update:    03/06/2021
+Last Update:    10/18/2026
 
-Description:    This script will consume a dictionary containing a host or hosts with their associated services and ports. For each service
-                and port, the tcp_test.check_port() fucntion will be called to see if the service is online or not. After the status is captured,
-                the results will be written in html format to the output file specified.
+Description:    This script will consume a dictionary containing a host or hosts with their associated services and ports. Every service
+                is probed through an app_probes.Prober, which runs a tcp connect (tcp_test.probe_port_async(), as used by
+                tcp_test.probe_ports()) for a plain port, to see if the service is online or not. After the status is captured,
+                the results will be written in html format to the output file specified. All services are probed concurrently on
+                the prober's event loop, so the report takes about one probe timeout no matter how many services are offline.
+                Each service shows its probe latency, services slower than the slow threshold are shown as Slow, and offline
+                services show why the probe failed (timeout, refused, unreachable, dns, or the unexpected reply).
 
-Input:          None
+                A service can also be probed at the application level (see app_probes.py), so a hung app that still
+                accepts connections shows as Offline or Slow: an http GET with an expected status and body substring,
+                or a redis PING. These probes reuse pooled keep-alive connections between daemon rounds, and each
+                service can set its own latency SLO (slo_ms) in place of --slow-ms.
 
-Standard Form:  python gen_html_report.py
+                With --daemon the services are re-probed every --interval seconds, and a compact history is kept per
+                service (uptime %, time of the last status change and p50/p95/p99 probe latency over the most recent
+                probes). The page is only regenerated when a status changes, the config file changes, or the page is
+                older than --max-age, and it is always written atomically (to a temporary file that replaces the page),
+                so readers never see a half written report. Services are read from a json config file of the form
+                {"host": {"service": port or probe, ...}, ...}, which is reloaded when it changes, e.g.
+                    {"localhost": {"ssh": 22,
+                                   "web_app": {"type": "http", "port": 5000, "path": "/", "expect_body": "Hello",
+                                               "slo_ms": 300},
+                                   "redis": {"type": "redis", "port": 6379, "slo_ms": 50}}}
+
+Input:          --config        = optional json file of hosts, services and ports (default: the built in test_app)
+                --output        = optional html file to write (default: /var/www/html/service_status.html)
+                --daemon        = optional, keep probing on a schedule until control+c
+                --interval      = optional seconds between probes in daemon mode (default: 30)
+                --max-age       = optional seconds after which the page is regenerated even without changes (default: 300)
+                --timeout       = optional seconds to wait for each port (default: 1)
+                --concurrency   = optional maximum number of ports probed at once (default: 100)
+                --slow-ms       = optional latency in milliseconds above which a service without its own slo_ms is
+                                  shown as Slow (default: 200)
+
+Standard Form:  python gen_html_report.py [--config <file>] [--output <file>] [--timeout <seconds>] [--concurrency <int>]
+                    [--slow-ms <milliseconds>] [--daemon [--interval <seconds>] [--max-age <seconds>]]
 
 """
 
 
 output_file = '/var/www/html/service_status.html'
 online_str = '<p style="color:green">Online</p>'
-offline_str = '<p style="color:red">Offline</p>'
+slow_str = '<p style="color:orange">Slow</p>'
+offline_str = '<p style="color:red">Offline ({})</p>'
 
 test_app = {'127.0.0.1': {'apache': 80, 'tomcat': 8080},
             'localhost': {'apache2': 80}  
            }
+LATENCY_HISTORY = 1000  # successful probes per service kept for latency percentiles
 
 
-def check_app(servers):
-    """returns the status of every service provided (online or offline) in html format"""
-    tmp_str = ''
+class ServiceHistory:
+    """
+    ServiceHistory keeps the uptime counters, last status change and recent probe latencies of one service.
+    """
 
-    for host, services in servers.items():
-        counter = 0
-        for service, port in services.items():
-            result = tcp_test.check_port(host, port)
+    def __init__(self):
+        self.checks = 0
+        self.up = 0
+        self.status = None
+        self.last_change = None
+        self.latencies = deque(maxlen=LATENCY_HISTORY)  # milliseconds
+
+    def record(self, timestamp, status, result):
+        """record one probe. returns True if the status changed."""
+        self.checks += 1
+        if result.ok:
+            self.up += 1
+            self.latencies.append(result.latency_ns / 1000000)
+        changed = status != self.status
+        if changed:
+            self.status = status
+            self.last_change = timestamp
+        return changed
+
+    def uptime(self):
+        return self.up / self.checks * 100 if self.checks else 0.0
+
+    def percentiles(self, *percents):
+        """returns the latency (ms) at each percentile, or None for each if nothing has connected yet."""
+        if not self.latencies:
+            return [None] * len(percents)
+        latencies = sorted(self.latencies)
+        return [latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100))] for percent in percents]
+
+
+def probe_services(servers, timeout=1, concurrency=100, prober=None):
+    """
+    returns a (host, service, probe, tcp_test.ProbeResult) tuple for every service provided, in config order, where
+    probe is the service's app_probes.parse_probe() spec.
+    :param prober: optional app_probes.Prober to probe with, so pooled connections are kept between calls. a temporary
+    one is used if not provided.
+    """
+    # probe every service at once. results come back in the same order as the (host, probe) pairs
+    services = [(host, service, app_probes.parse_probe(spec))
+                for host, host_services in servers.items() for service, spec in host_services.items()]
+    own_prober = prober is None
+    if own_prober:
+        prober = app_probes.Prober(timeout, concurrency)
+    try:
+        results = prober.probe([(host, probe) for host, _, probe in services])
+    finally:
+        if own_prober:
+            prober.close()
+    return [service + (result,) for service, result in zip(services, results)]
+
+
+def get_status(result, slow_ms=200):
+    """returns the status of a probe: online, slow or offline with the reason"""
+    if not result.ok:
+        return 'offline ({})'.format(result.reason)
+    return 'slow' if result.latency_ns / 1000000 > slow_ms else 'online'
+
+
+def history_key(host, service, probe):
+    return host, service, probe['type'], probe['port']
+
+
+def render_rows(probes, slow_ms=200, histories=None):
+    """
+    returns the html table rows for a list of probe_services results. rows are collected in a list and joined once,
+    so rendering stays linear in the number of services.
+    :param slow_ms: latency above which a service without its own slo_ms is shown as slow.
+    :param histories: optional dictionary of history_key() to ServiceHistory, adding the history columns.
+    """
+    rows = []
+    previous_host = None
+    for host, service, probe, result in probes:
+        status = get_status(result, probe['slo_ms'] or slow_ms)
+        if status == 'online':
+            status_str = online_str
+        elif status == 'slow':
+            status_str = slow_str
+        else:
+            status_str = offline_str.format(html.escape(result.reason))
+        latency = '{:.1f} ms'.format(result.latency_ns / 1000000) if result.ok else '-'
 
-            if result:
-                status = online_str
-            else:
-                status = offline_str
+        cells = [html.escape(host) if host != previous_host else '', html.escape(service), str(probe['port']),
+                 probe_label(probe), status_str, latency]
+        previous_host = host
+        if histories is not None:
+            history = histories[history_key(host, service, probe)]
+            cells.append('{:.2f} %'.format(history.uptime()))
+            cells.append(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(history.last_change)))
+            cells.append(' / '.join('-' if value is None else '{:.1f}'.format(value) for value in history.percentiles(50, 95, 99)))
+        rows.append('<tr><td>' + '</td><td>'.join(cells) + '</td></tr>')
+    return '\n'.join(rows)
 
-            if counter == 0:
-                tmp_str += '<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td>'.format(host, service, port, status)
-            else:
-                tmp_str += '<tr><td></td><td>{}</td><td>{}</td><td>{}</td>'.format(service, port, status)
-            counter += 1
 
-    return tmp_str 
+def probe_label(probe):
+    """returns a short html description of what a probe checks"""
+    if probe['type'] == 'http':
+        label = 'http GET {} = {}'.format(probe['path'], probe['expect_status'])
+        if probe['expect_body'] is not None:
+            label += ' containing "{}"'.format(probe['expect_body'])
+    else:
+        label = probe['type']
+    if probe['slo_ms'] is not None:
+        label += ' (slo {:g} ms)'.format(probe['slo_ms'])
+    return html.escape(label)
 
 
-def print_header():
-    return '<html><table border="1"><tr><th>Server</th><th>Service</th><th>Port</th><th>Status</th></tr>'
+def check_app(servers, timeout=1, concurrency=100, slow_ms=200):
+    """returns the status of every service provided (online, slow or offline) and its latency in html format"""
+    return render_rows(probe_services(servers, timeout, concurrency), slow_ms)
 
 
-def print_footer():
-    return '</table></html>'
+def print_header(history=False):
+    columns = ['Server', 'Service', 'Port', 'Probe', 'Status', 'Latency']
+    if history:
+        columns += ['Uptime', 'Last Change', 'Latency p50 / p95 / p99 (ms)']
+    return '<html><table border="1"><tr><th>' + '</th><th>'.join(columns) + '</th></tr>\n'
+
+
+def print_footer(generated=None):
+    footer = '\n</table>'
+    if generated is not None:
+        footer += '<p>Generated {}</p>'.format(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(generated)))
+    return footer + '</html>\n'
+
+
+def write_atomic(path, content):
+    """write content to a temporary file next to path, then rename it over path so readers never see a partial file"""
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_config(path):
+    """returns the {host: {service: port or probe}} dictionary in a json config file"""
+    with open(path) as f:
+        servers = json.load(f)
+    if not isinstance(servers, dict) or not all(isinstance(services, dict) for services in servers.values()):
+        raise ValueError('{} must map each host to a dictionary of service names and ports or probes'.format(path))
+    for host, services in servers.items():
+        for service, spec in services.items():
+            try:
+                app_probes.parse_probe(spec)
+            except ValueError as err:
+                raise ValueError('{}: {} on {}: {}'.format(path, service, host, err))
+    return servers
+
+
+def run_daemon(servers, config, output, interval=30, max_age=300, timeout=1, concurrency=100, slow_ms=200):
+    """
+    re-probe every service on a fixed schedule, and rewrite the report when a status or the config changes. errors
+    reloading the config or writing the report are printed, and the daemon carries on.
+    :param servers: the {host: {service: port or probe}} dictionary to start with, already loaded from config.
+    :param config: json config file that is reloaded when it changes, or None to keep servers.
+    """
+    config_mtime = None
+    if config:
+        try:
+            config_mtime = os.path.getmtime(config)
+        except OSError:
+            pass  # reloaded once the file is back
+    histories = {}
+    written = None
+    next_probe = time.monotonic()
+    # one prober for the whole run, so http and redis probes keep reusing their pooled connections
+    prober = app_probes.Prober(timeout, concurrency)
+    print('Probing every {} second(s), writing {}. (press control+c to quit.)'.format(interval, output))
+
+    try:
+        while True:
+            changed = False
+            # reload the config when it changes. services that were removed drop their history. the file can be
+            # briefly missing while an editor or a deploy replaces it, so that only keeps the previous config
+            if config:
+                try:
+                    mtime = os.path.getmtime(config)
+                    if mtime != config_mtime:
+                        servers = load_config(config)
+                        config_mtime = mtime
+                        changed = True
+                except (OSError, ValueError) as err:
+                    print('Error: keeping the previous config, unable to reload {}: {}'.format(config, err))
+
+            now = time.time()
+            probes = probe_services(servers, timeout, concurrency, prober)
+            keys = set()
+            for host, service, probe, result in probes:
+                key = history_key(host, service, probe)
+                keys.add(key)
+                if key not in histories:
+                    histories[key] = ServiceHistory()
+                changed |= histories[key].record(now, get_status(result, probe['slo_ms'] or slow_ms), result)
+            for key in set(histories) - keys:
+                del histories[key]
+
+            if changed or written is None or time.monotonic() - written >= max_age:
+                try:
+                    write_atomic(output, print_header(True) + render_rows(probes, slow_ms, histories) + print_footer(now))
+                    written = time.monotonic()
+                except OSError as err:
+                    # leave written unset, so the report is written again after the next probe
+                    print('Error: unable to write {}: {}'.format(output, err))
+                    written = None
+
+            # sleep until the next scheduled probe. if a round overran, skip ahead instead of probing back to back
+            next_probe += interval
+            current = time.monotonic()
+            if next_probe < current:
+                next_probe = current + interval - ((current - next_probe) % interval)
+            time.sleep(next_probe - current)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        prober.close()
 
 
 if __name__ == '__main__':
-    html_str = print_header()
-    html_str += check_app(test_app)
-    html_str += print_footer()
+    parser = argparse.ArgumentParser(description='Write the online/offline status of services to an html report.')
+    parser.add_argument('--config', help='json file of hosts, services and ports (default: the built in test_app)')
+    parser.add_argument('--output', default=output_file, help='html file to write (default: {})'.format(output_file))
+    parser.add_argument('--daemon', action='store_true', help='keep probing on a schedule until control+c')
+    parser.add_argument('--interval', type=float, default=30, help='seconds between probes in daemon mode (default: 30)')
+    parser.add_argument('--max-age', type=float, default=300, help='seconds after which the page is regenerated even without changes (default: 300)')
+    parser.add_argument('--timeout', type=float, default=1, help='seconds to wait for each port (default: 1)')
+    parser.add_argument('--concurrency', type=int, default=100, help='maximum number of ports probed at once (default: 100)')
+    parser.add_argument('--slow-ms', type=float, default=200, help='latency in milliseconds above which a service without its own slo_ms is shown as Slow (default: 200)')
+    args = parser.parse_args()
+    if min(args.timeout, args.concurrency, args.slow_ms, args.interval, args.max_age) <= 0:
+        parser.error('--timeout, --concurrency, --slow-ms, --interval and --max-age must be positive')
+
+    try:
+        servers = load_config(args.config) if args.config else test_app
+    except (OSError, ValueError) as err:
+        parser.error('unable to load config: {}'.format(err))
 
-    with open(output_file, 'w') as f:
-        f.write(html_str)
+    if args.daemon:
+        run_daemon(servers, args.config, args.output, args.interval, args.max_age, args.timeout, args.concurrency,
+                   args.slow_ms)
+    else:
+        html_str = print_header()
+        html_str += check_app(servers, args.timeout, args.concurrency, args.slow_ms)
+        html_str += print_footer()
 
+        write_atomic(args.output, html_str)
@@ -1,34 +1,200 @@
-import sys
+from collections import namedtuple
+import threading
+import asyncio
 import socket
+import errno
+import time
+import sys
 
 """
 Author:         Nick Loden
 
-Last Update:    03/06/2021
+Last Update:    10/18/2026
 
-Description:    This script will provide a way to check a system and tcp port to determine if a connection can be made. 
+Description:    This script will provide a way to check a system and tcp port to determine if a connection can be made.
+                probe_ports() checks many (host, port) pairs at once on an asyncio event loop, with a cap on the number
+                of connections in flight, so checking N ports takes about one timeout instead of N. Every probe
+                reports its connect latency and, when it fails, why (timeout, refused, unreachable or dns). Host names
+                are resolved once per DNS_TTL seconds through a resolver cache shared by all probes, and hosts with
+                both IPv6 and IPv4 addresses are connected to with happy eyeballs (RFC 8305): address families are
+                interleaved and the next address is tried if the previous one has not connected within
+                HAPPY_EYEBALLS_DELAY seconds.
 
-Input:          hostname/IPv4 address & tcp port 
+Input:          hostname/IPv4/IPv6 address & tcp port
 
 Standard Form:  import tcp_test
                 tcp_test.check_port(server.example.com, 80)
+                tcp_test.probe_ports([(server.example.com, 80), (server.example.com, 443)], timeout=1, concurrency=100)
 
 """
 
 
-def check_port(host, port):
-    """returns true if a connection can be made with the provided host and port"""
-    timeout = 1
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.settimeout(timeout)
+DNS_TTL = 60  # seconds a resolved host name is reused
+DNS_NEGATIVE_TTL = 5  # seconds a failed lookup is reused
+HAPPY_EYEBALLS_DELAY = 0.25  # seconds before the next address is tried while a connection attempt is still pending
+
+ProbeResult = namedtuple('ProbeResult', ['host', 'port', 'ok', 'reason', 'latency_ns', 'address'])
+
+_dns_cache = {}  # host -> (expiry on the monotonic clock, list of addresses or the lookup error)
+_dns_lock = threading.Lock()
+
+
+class ResolveError(Exception):
+    """raised when a host name cannot be resolved."""
+
+
+def order_addresses(addresses):
+    """
+    returns addresses with their families interleaved, starting with the family of the first address, as happy
+    eyeballs recommends. duplicates are removed.
+    """
+    by_family = {}
+    for family, address in addresses:
+        if address not in by_family.setdefault(family, []):
+            by_family[family].append(address)
+    families = list(by_family.values())
+    ordered = []
+    for index in range(max((len(family) for family in families), default=0)):
+        ordered.extend(family[index] for family in families if index < len(family))
+    return ordered
+
+
+def _cached_addresses(host):
+    with _dns_lock:
+        cached = _dns_cache.get(host)
+    if cached is None or cached[0] < time.monotonic():
+        return None
+    if isinstance(cached[1], ResolveError):
+        raise cached[1]
+    return cached[1]
+
+
+def _cache_addresses(host, infos=None, error=None):
+    if error is not None:
+        entry = (time.monotonic() + DNS_NEGATIVE_TTL, ResolveError('{}: {}'.format(host, error)))
+    else:
+        entry = (time.monotonic() + DNS_TTL, order_addresses([(info[0], info[4][0]) for info in infos]))
+    with _dns_lock:
+        _dns_cache[host] = entry
+    if error is not None:
+        raise entry[1]
+    return entry[1]
+
+
+def resolve(host):
+    """returns the ip addresses of a host, in connection order, from the resolver cache when possible."""
+    addresses = _cached_addresses(host)
+    if addresses is not None:
+        return addresses
+    try:
+        infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    except socket.gaierror as err:
+        return _cache_addresses(host, error=err)
+    return _cache_addresses(host, infos)
+
 
+async def resolve_async(host, timeout):
+    """resolve() on the running event loop, giving up after timeout seconds."""
+    addresses = _cached_addresses(host)
+    if addresses is not None:
+        return addresses
     try:
-        s.connect((host, port))
-        s.shutdown(socket.SHUT_RDWR)
-        return True
-    except:
-        return False
+        infos = await asyncio.wait_for(asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM), timeout)
+    except (socket.gaierror, asyncio.TimeoutError) as err:
+        return _cache_addresses(host, error=err if isinstance(err, socket.gaierror) else 'lookup timed out')
+    return _cache_addresses(host, infos)
+
+
+def failure_reason(err):
+    """returns a short reason for a failed connection attempt."""
+    if isinstance(err, (asyncio.TimeoutError, TimeoutError)):
+        return 'timeout'
+    if isinstance(err, ConnectionRefusedError):
+        return 'refused'
+    if isinstance(err, OSError) and err.errno in (errno.EHOSTUNREACH, errno.ENETUNREACH):
+        return 'unreachable'
+    return str(err) or type(err).__name__
+
+
+async def _connect(address, port):
+    reader, writer = await asyncio.open_connection(address, port)
+    return address, reader, writer
+
+
+async def connect_happy_eyeballs(addresses, port, delay=HAPPY_EYEBALLS_DELAY):
+    """
+    connect_happy_eyeballs starts a connection attempt to each address in turn, starting the next one when the
+    previous attempt fails or has not connected within delay seconds, and keeps the first connection made.
+    :return: (address, stream reader, stream writer) of the winning connection. every other attempt is cancelled or
+    closed.
+    """
+    remaining = list(addresses)
+    pending = set()
+    errors = []
+    try:
+        while remaining or pending:
+            if remaining:
+                pending.add(asyncio.ensure_future(_connect(remaining.pop(0), port)))
+            done, pending = await asyncio.wait(pending, timeout=delay if remaining else None,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            winners = [task for task in done if task.exception() is None]
+            errors.extend(task.exception() for task in done if task.exception() is not None)
+            if winners:
+                for task in winners[1:]:
+                    task.result()[2].close()
+                return winners[0].result()
+        raise errors[-1]
     finally:
-        s.close()
+        for task in pending:
+            task.cancel()
+
+
+async def probe_port_async(host, port, timeout, semaphore):
+    """returns a ProbeResult for the provided host and port, giving up after timeout seconds"""
+    async with semaphore:
+        start = time.monotonic_ns()
+        try:
+            addresses = await resolve_async(host, timeout)
+        except ResolveError:
+            return ProbeResult(host, port, False, 'dns', time.monotonic_ns() - start, None)
 
+        start = time.monotonic_ns()
+        try:
+            address, reader, writer = await asyncio.wait_for(connect_happy_eyeballs(addresses, port), timeout)
+        except (OSError, asyncio.TimeoutError) as err:
+            return ProbeResult(host, port, False, failure_reason(err), time.monotonic_ns() - start, None)
+        latency_ns = time.monotonic_ns() - start
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return ProbeResult(host, port, True, 'connected', latency_ns, address)
 
+
+async def probe_ports_async(targets, timeout=1, concurrency=100):
+    """returns a list with the probe_port_async result of every (host, port) in targets, in the same order"""
+    semaphore = asyncio.Semaphore(concurrency)
+    # resolve every distinct host once up front, so probes of the same host share a single lookup
+    hosts = {host for host, _ in targets}
+    await asyncio.gather(*(resolve_async(host, timeout) for host in hosts), return_exceptions=True)
+    return await asyncio.gather(*(probe_port_async(host, port, timeout, semaphore) for host, port in targets))
+
+
+def probe_ports(targets, timeout=1, concurrency=100):
+    """
+    returns a list of ProbeResult, one per (host, port) in targets and in the same order. at most `concurrency`
+    connections are attempted at once, and each gives up after `timeout` seconds. latency_ns is the connect time in
+    nanoseconds (monotonic clock), and reason is connected, timeout, refused, unreachable, dns or an error message.
+    """
+    return asyncio.run(probe_ports_async(list(targets), timeout, concurrency))
+
+
+def check_ports(targets, timeout=1, concurrency=100):
+    """returns a list of booleans, one per (host, port) in targets, that are true if a connection can be made"""
+    return [result.ok for result in probe_ports(targets, timeout, concurrency)]
+
+
+def check_port(host, port, timeout=1):
+    """returns true if a connection can be made with the provided host and port"""
+    return probe_ports([(host, port)], timeout)[0].ok
@@ -17,8 +17,8 @@ apt install python3-pip -y
 # verify pip3 version
 pip3 --version
 
-# install flask
-pip3 install flask
+# install flask and numpy (used by the /benchmark endpoints)
+pip3 install flask numpy
 
 # install nginx
 apt install nginx -y
@@ -1,5 +1,10 @@
 #!/usr/bin/python3
-from flask import Flask
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, jsonify, request
+import numpy as np
+import tracemalloc
+import threading
+import heapq
 import time
 import string
 import random
@@ -8,6 +13,21 @@ app = Flask(__name__)
 port = REPLACE_WITH_PORT 
 node = REPLACE_WITH_INSTANCE_NUMBER 
 
+BENCHMARK_OPS = ('sort', 'sum', 'topk')
+BENCHMARK_MODES = ('python', 'numpy', 'chunked')
+MAX_BENCHMARK_SIZE = 10000000  # largest n accepted, so one request cannot exhaust the instance's memory
+DEFAULT_CHUNK_SIZE = 65536
+MERGE_BLOCK = 4096  # values converted to python floats at a time while merging sorted chunks
+BENCHMARK_WORKERS = 2  # benchmarks run at once per instance
+BENCHMARK_QUEUE = 2  # benchmarks waiting for a worker. requests beyond workers + queue are rejected with a 503
+BUSY_RETRY_AFTER = 1  # seconds a rejected client is told to wait before retrying
+
+_benchmark_executor = ThreadPoolExecutor(max_workers=BENCHMARK_WORKERS, thread_name_prefix='benchmark')
+_benchmark_slots = threading.BoundedSemaphore(BENCHMARK_WORKERS + BENCHMARK_QUEUE)
+_runs_lock = threading.Lock()
+_active_runs = set()  # BenchmarkRun objects currently measuring
+_traced_runs = 0  # active runs that measure memory. tracemalloc runs while this is above 0
+
 @app.route('/')
 def welcome():
     return 'Hello from web app instance {}!'.format(node), 200
@@ -35,11 +55,224 @@ def instance_uuid():
 @app.route('/long_query/<num>')
 def long_running_query(num=1000000):
     """Sort an array of randomly generated numbers, and return the execution time. If no number
-    is specified, then the default value of 1,000,000 will be used."""
-    start_time = time.time()
-    sorted_array = sorted([random.random() for i in range(int(num))])
-    end_time = time.time()
-    return 'It took {} seconds to sort an array of {} random numbers!'.format(str(end_time - start_time), num)
+    is specified, then the default value of 1,000,000 will be used. See /benchmark/<op> for other
+    implementations and the cpu time and memory they use."""
+    try:
+        n = int(num)
+    except ValueError:
+        return 'Error: the number of values must be an integer\n', 400
+    if not 0 <= n <= MAX_BENCHMARK_SIZE:
+        return 'Error: the number of values must be between 0 and {}\n'.format(MAX_BENCHMARK_SIZE), 400
+    report = submit_benchmark('sort', 'python', n, measure_memory=False)
+    if report is None:
+        return busy_response()
+    return 'It took {} seconds to sort an array of {} random numbers!'.format(str(report['wall_seconds']), num)
+
+
+@app.route('/benchmark/<op>')
+def benchmark(op):
+    """Run one benchmark operation and return a json report of its result, wall time, cpu time and
+    peak memory. op is sort, sum or topk, and the query parameters select how it runs:
+        mode    = python (lists and built ins), numpy (vectorized arrays) or chunked (numpy arrays of
+                  chunk values at a time, merged as a stream) (default: python)
+        n       = number of random values (default: 1,000,000)
+        k       = number of largest values returned by topk (default: 10)
+        chunk   = values per chunk in chunked mode (default: 65,536)
+        seed    = random seed, so runs can be repeated (default: random)
+        memory  = 0 to skip measuring peak memory, which slows down allocation heavy runs (default: 1)
+    e.g. curl 'http://localhost/benchmark/topk?mode=numpy&n=5000000&k=5'
+    Under concurrent load, peak memory includes the allocations of runs that overlapped this one,
+    which overlapped reports as true. node shows which instance behind nginx served the run.
+    Runs go to a pool of BENCHMARK_WORKERS threads with BENCHMARK_QUEUE waiting slots, so a burst
+    of benchmarks cannot take every werkzeug thread or all of the instance's cpu and memory. When
+    every slot is taken the request is rejected with a 503 at once, which nginx retries on the
+    next instance. queued_seconds reports how long the run waited for a worker."""
+    if op not in BENCHMARK_OPS:
+        return 'Error: unknown benchmark {}, expected one of {}\n'.format(op, ', '.join(BENCHMARK_OPS)), 404
+    mode = request.args.get('mode', 'python')
+    if mode not in BENCHMARK_MODES:
+        return 'Error: unknown mode {}, expected one of {}\n'.format(mode, ', '.join(BENCHMARK_MODES)), 400
+    try:
+        n = int(request.args.get('n', 1000000))
+        k = int(request.args.get('k', 10))
+        chunk = int(request.args.get('chunk', DEFAULT_CHUNK_SIZE))
+        seed = int(request.args['seed']) if 'seed' in request.args else random.randrange(2 ** 32)
+    except ValueError:
+        return 'Error: n, k, chunk and seed must be integers\n', 400
+    if not 0 < n <= MAX_BENCHMARK_SIZE or chunk <= 0:
+        return 'Error: n must be between 1 and {} and chunk must be positive\n'.format(MAX_BENCHMARK_SIZE), 400
+    if op == 'topk' and not 0 < k <= n:
+        return 'Error: k must be between 1 and n\n', 400
+    report = submit_benchmark(op, mode, n, k, chunk, seed, request.args.get('memory', '1') != '0')
+    if report is None:
+        return busy_response()
+    return jsonify(report)
+
+
+def busy_response():
+    return ('Error: instance {} already has {} benchmark(s) running or queued, try again later\n'.format(
+        node, BENCHMARK_WORKERS + BENCHMARK_QUEUE), 503, {'Retry-After': str(BUSY_RETRY_AFTER)})
+
+
+def submit_benchmark(*args, **kwargs):
+    """Run a benchmark on the benchmark pool and wait for its report. Returns None without running
+    it if the pool's workers and queue are all taken."""
+    if not _benchmark_slots.acquire(blocking=False):
+        return None
+    submitted = time.perf_counter()
+
+    def task():
+        queued_seconds = time.perf_counter() - submitted
+        report = run_benchmark(*args, **kwargs)
+        report['queued_seconds'] = queued_seconds
+        return report
+
+    try:
+        return _benchmark_executor.submit(task).result()
+    finally:
+        _benchmark_slots.release()
+
+
+class BenchmarkRun:
+    """Measures the wall time, cpu time of the calling thread and, optionally, peak traced memory
+    of the code run inside it. Werkzeug serves each request on its own thread, so cpu time is
+    per thread, while tracemalloc is shared by the process and runs while any run measures memory."""
+
+    def __init__(self, measure_memory=True):
+        self.measure_memory = measure_memory
+        self.overlapped = False
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_memory_bytes = None
+
+    def __enter__(self):
+        global _traced_runs
+        with _runs_lock:
+            if _active_runs:
+                self.overlapped = True
+                for run in _active_runs:
+                    run.overlapped = True
+            _active_runs.add(self)
+            if self.measure_memory:
+                if _traced_runs == 0:
+                    tracemalloc.start()
+                _traced_runs += 1
+                self._base_memory = tracemalloc.get_traced_memory()[0]
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        global _traced_runs
+        self.cpu_seconds = time.thread_time() - self._cpu_start
+        self.wall_seconds = time.perf_counter() - self._wall_start
+        with _runs_lock:
+            _active_runs.discard(self)
+            if self.measure_memory:
+                self.peak_memory_bytes = max(0, tracemalloc.get_traced_memory()[1] - self._base_memory)
+                _traced_runs -= 1
+                if _traced_runs == 0:
+                    tracemalloc.stop()
+        return False
+
+
+def python_sort(n, k, seed, chunk):
+    rand = random.Random(seed)
+    values = sorted([rand.random() for _ in range(n)])
+    if not values:
+        return {'min': None, 'median': None, 'max': None}
+    return {'min': values[0], 'median': values[n // 2], 'max': values[-1]}
+
+
+def python_sum(n, k, seed, chunk):
+    rand = random.Random(seed)
+    return {'sum': sum([rand.random() for _ in range(n)])}
+
+
+def python_topk(n, k, seed, chunk):
+    rand = random.Random(seed)
+    return {'top': heapq.nlargest(k, [rand.random() for _ in range(n)])}
+
+
+def numpy_sort(n, k, seed, chunk):
+    values = np.random.default_rng(seed).random(n)
+    if n == 0:
+        return {'min': None, 'median': None, 'max': None}
+    values.sort()  # in place, so no second array is allocated
+    return {'min': float(values[0]), 'median': float(values[n // 2]), 'max': float(values[-1])}
+
+
+def numpy_sum(n, k, seed, chunk):
+    return {'sum': float(np.random.default_rng(seed).random(n).sum())}
+
+
+def numpy_topk(n, k, seed, chunk):
+    # partition puts the k largest values last without sorting the rest
+    top = np.partition(np.random.default_rng(seed).random(n), n - k)[n - k:]
+    return {'top': np.sort(top)[::-1].tolist()}
+
+
+def numpy_chunks(n, seed, chunk):
+    """Yields n random values as numpy arrays of at most chunk values, the same values numpy mode draws for the seed."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, chunk):
+        yield rng.random(min(chunk, n - start))
+
+
+def merge_values(run):
+    """Yields the values of a sorted array as python floats, converting MERGE_BLOCK values at a time."""
+    for start in range(0, len(run), MERGE_BLOCK):
+        yield from run[start:start + MERGE_BLOCK].tolist()
+
+
+def chunked_sort(n, k, seed, chunk):
+    # sort each chunk, then stream a k-way merge of the sorted chunks, as an external sort does with
+    # runs on disk. the merged order is never held as one list
+    runs = [np.sort(values) for values in numpy_chunks(n, seed, chunk)]
+    result = {'min': None, 'median': None}
+    value = None
+    for index, value in enumerate(heapq.merge(*(merge_values(run) for run in runs))):
+        if index == 0:
+            result['min'] = value
+        if index == n // 2:
+            result['median'] = value
+    result['max'] = value
+    return result
+
+
+def chunked_sum(n, k, seed, chunk):
+    return {'sum': sum(float(values.sum()) for values in numpy_chunks(n, seed, chunk))}
+
+
+def chunked_topk(n, k, seed, chunk):
+    # keep only the k largest values seen so far, so memory stays at about k + chunk values
+    top = np.empty(0)
+    for values in numpy_chunks(n, seed, chunk):
+        top = np.concatenate((top, values))
+        if len(top) > k:
+            top = np.partition(top, len(top) - k)[len(top) - k:]
+    return {'top': np.sort(top)[::-1].tolist()}
+
+
+BENCHMARKS = {
+    ('sort', 'python'): python_sort, ('sum', 'python'): python_sum, ('topk', 'python'): python_topk,
+    ('sort', 'numpy'): numpy_sort, ('sum', 'numpy'): numpy_sum, ('topk', 'numpy'): numpy_topk,
+    ('sort', 'chunked'): chunked_sort, ('sum', 'chunked'): chunked_sum, ('topk', 'chunked'): chunked_topk,
+}
+
+
+def run_benchmark(op, mode, n, k=10, chunk=DEFAULT_CHUNK_SIZE, seed=None, measure_memory=True):
+    """Run one benchmark and return its report: the parameters, the result and the measurements."""
+    with BenchmarkRun(measure_memory) as run:
+        result = BENCHMARKS[(op, mode)](n, k, seed, chunk)
+    report = {'node': node, 'op': op, 'mode': mode, 'n': n, 'seed': seed, 'result': result,
+              'wall_seconds': run.wall_seconds, 'cpu_seconds': run.cpu_seconds,
+              'peak_memory_bytes': run.peak_memory_bytes, 'overlapped': run.overlapped}
+    if op == 'topk':
+        report['k'] = k
+    if mode == 'chunked':
+        report['chunk'] = chunk
+    return report
 
 
 def gen_instance_uuid():